@@ -6,7 +6,7 @@ import json
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 
-from promptforge.api_utils import lint_payload, read_json, write_json
+from promptforge.api_utils import linter_for, lint_response, read_json, write_json, write_json_bytes
 
 
 class handler(BaseHTTPRequestHandler):
@@ -17,7 +17,12 @@ class handler(BaseHTTPRequestHandler):
             write_json(self, {"error": "Invalid JSON"}, status=HTTPStatus.BAD_REQUEST)
             return
         text = payload.get("text", "")
-        write_json(self, lint_payload(text))
+        try:
+            linter = linter_for(payload)
+        except ValueError as exc:
+            write_json(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+            return
+        write_json_bytes(self, lint_response(text, linter))
 
     def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
         self.send_error(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
@@ -0,0 +1,32 @@
+"""Vercel serverless handler for batch linting."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+
+from promptforge.api_utils import (
+    iter_json_records,
+    lint_batch_lines,
+    linter_for,
+    query_params,
+    write_json,
+    write_ndjson,
+)
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            linter = linter_for(query_params(self.path))
+        except ValueError as exc:
+            write_json(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+            return
+        write_ndjson(self, lint_batch_lines(iter_json_records(self.rfile, length), linter))
+
+    def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        self.send_error(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
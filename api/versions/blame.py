@@ -0,0 +1,19 @@
+"""Vercel serverless handler for blaming the latest version of a label."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+
+from promptforge.api_utils import write_blame
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        write_blame(self)
+
+    def do_POST(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        self.send_error(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
@@ -18,7 +18,8 @@ class handler(BaseHTTPRequestHandler):
             return
         file_a = payload.get("a")
         file_b = payload.get("b")
-        payload, status = diff_versions_payload(file_a, file_b)
+        granularity = payload.get("granularity", "line")
+        payload, status = diff_versions_payload(file_a, file_b, granularity)
         write_json(self, payload, status=status)
 
     def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
@@ -5,12 +5,12 @@ from __future__ import annotations
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 
-from promptforge.api_utils import list_versions_payload, write_json
+from promptforge.api_utils import write_versions_list
 
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
-        write_json(self, list_versions_payload())
+        write_versions_list(self)
 
     def do_POST(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
         self.send_error(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
@@ -0,0 +1,19 @@
+"""Vercel serverless handler for finding near-duplicate versions."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+
+from promptforge.api_utils import write_similar_versions
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        write_similar_versions(self)
+
+    def do_POST(self) -> None:  # noqa: N802 - required by BaseHTTPRequestHandler
+        self.send_error(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
@@ -0,0 +1,5 @@
+"""Reproducible performance benchmarks for PromptForge.
+
+Run ``python -m benchmarks run`` from the repository root; see
+``python -m benchmarks --help`` for the compare mode.
+"""
@@ -0,0 +1,110 @@
+"""Command-line entry point: ``python -m benchmarks {run,compare,imports}``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.corpus import CorpusSpec
+from benchmarks.imports import check_budgets
+from benchmarks.runner import HISTORY_SIZES, QUICK_HISTORY_SIZES, compare_results, run_benchmarks
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="PromptForge benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write JSON results.")
+    run_parser.add_argument("-o", "--output", type=Path, help="Write results here instead of stdout.")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller corpus and histories, fewer runs.")
+    run_parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this text.")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Minimum runs per benchmark (default: %(default)s).")
+    run_parser.add_argument("--documents", type=int, default=200, help="Prompts in the corpus (default: %(default)s).")
+    run_parser.add_argument("--lines", type=int, default=20, help="Lines per prompt (default: %(default)s).")
+    run_parser.add_argument(
+        "--marker-density",
+        type=float,
+        default=0.05,
+        help="Fraction of words taken from the rule vocabulary (default: %(default)s).",
+    )
+    run_parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: %(default)s).")
+    run_parser.add_argument("--baseline", type=Path, help="Compare against this results file when done.")
+    run_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed median slowdown before flagging a regression (default: %(default)s).",
+    )
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files.")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    imports_parser = subparsers.add_parser(
+        "imports", help="Fail if an entry point's cold import exceeds its time budget or loads heavy modules."
+    )
+    imports_parser.add_argument("--runs", type=int, default=5, help="Cold runs per entry point (default: %(default)s).")
+    return parser
+
+
+def _report(rows: list[dict], threshold: float) -> int:
+    width = max((len(row["name"]) for row in rows), default=0)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<{width}}  {row['baseline'] * 1e3:10.3f} ms  {row['current'] * 1e3:10.3f} ms"
+            f"  x{row['ratio']:.2f}{flag}",
+            file=sys.stderr,
+        )
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} of {len(rows)} benchmarks slower than +{threshold:.0%}.", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "imports":
+        failures = check_budgets(runs=args.runs)
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+
+    if args.command == "compare":
+        return _report(compare_results(_load(args.baseline), _load(args.current), args.threshold), args.threshold)
+
+    spec = CorpusSpec(
+        documents=min(args.documents, 50) if args.quick else args.documents,
+        lines=args.lines,
+        marker_density=args.marker_density,
+        seed=args.seed,
+    )
+    results = run_benchmarks(
+        spec,
+        repeat=2 if args.quick else args.repeat,
+        min_time=0.0 if args.quick else 0.2,
+        history_sizes=QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES,
+        name_filter=args.filter,
+        progress=lambda name, result: print(f"{name}: {result['median'] * 1e3:.3f} ms", file=sys.stderr),
+    )
+    text = json.dumps(results, indent=2) + "\n"
+    if args.output is not None:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    if args.baseline is not None:
+        return _report(compare_results(_load(args.baseline), results, args.threshold), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
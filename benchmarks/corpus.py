@@ -0,0 +1,70 @@
+"""Synthetic prompt corpus generator for the benchmarks."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import random
+from typing import Iterable
+
+from promptforge.rules import RULES, Rule
+
+_FILLER_WORDS = (
+    "the", "model", "should", "answer", "question", "about", "customer", "order", "history",
+    "using", "context", "below", "each", "step", "carefully", "with", "references", "from",
+    "document", "and", "include", "relevant", "details", "when", "possible", "avoid", "guessing",
+)
+
+
+def rule_markers(rules: Iterable[Rule] = RULES) -> tuple[str, ...]:
+    return tuple(sorted({marker for rule in rules for marker in rule.markers()}))
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of a synthetic corpus; equal specs always generate equal corpora."""
+
+    documents: int = 100
+    lines: int = 20
+    words_per_line: int = 12
+    # Fraction of words drawn from the rules' marker vocabulary instead of filler.
+    marker_density: float = 0.05
+    seed: int = 0
+
+
+def generate_prompt(rng: random.Random, lines: int, words_per_line: int, marker_density: float) -> str:
+    markers = rule_markers()
+    out: list[str] = []
+    for _ in range(lines):
+        words = [
+            rng.choice(markers) if rng.random() < marker_density else rng.choice(_FILLER_WORDS)
+            for _ in range(words_per_line)
+        ]
+        words[0] = words[0].capitalize()
+        out.append(" ".join(words) + ".")
+    return "\n".join(out) + "\n"
+
+
+def generate_corpus(spec: CorpusSpec) -> list[str]:
+    rng = random.Random(spec.seed)
+    return [
+        generate_prompt(rng, spec.lines, spec.words_per_line, spec.marker_density)
+        for _ in range(spec.documents)
+    ]
+
+
+def generate_history(base: str, versions: int, seed: int = 0, edits: int = 2) -> list[str]:
+    """Successive versions of ``base``, each a few line edits away from the previous one."""
+    rng = random.Random(seed)
+    history = [base]
+    lines = base.splitlines(keepends=True)
+    for _ in range(versions - 1):
+        lines = list(lines)
+        for _ in range(edits):
+            index = rng.randrange(len(lines) + 1)
+            replacement = generate_prompt(rng, 1, 12, 0.05)
+            if index < len(lines) and rng.random() < 0.7:
+                lines[index] = replacement
+            else:
+                lines.insert(index, replacement)
+        history.append("".join(lines))
+    return history
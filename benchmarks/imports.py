@@ -0,0 +1,86 @@
+"""Cold-start import budgets for the CLI and the serverless handlers."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that would mean a handler pulls in far more than it serves.
+_HEAVY = frozenset({"sqlite3", "difflib", "concurrent.futures", "multiprocessing"})
+_LINT = frozenset({"promptforge.lint", "promptforge.rules", "promptforge.matcher"})
+_STORAGE = frozenset({"promptforge.storage", "promptforge.delta", "promptforge.diff"})
+
+
+@dataclass(frozen=True)
+class Budget:
+    # A module name, or a file path for the serverless handlers (Vercel loads them by path).
+    target: str
+    # Cumulative import time of the module itself, best of several cold runs.
+    max_ms: float
+    forbidden: frozenset[str] = frozenset()
+
+
+BUDGETS = (
+    Budget("api/rules.py", 120.0, _HEAVY | _LINT | _STORAGE),
+    Budget("api/lint.py", 120.0, _HEAVY | _STORAGE),
+    Budget("api/lint/batch.py", 120.0, _HEAVY | _STORAGE),
+    Budget("api/versions/list.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/save.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/diff.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/similar.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/clusters.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/search.py", 120.0, _HEAVY | _LINT),
+    Budget("api/versions/blame.py", 120.0, _HEAVY | _LINT),
+    Budget("promptforge.cli", 80.0, _HEAVY | _LINT | _STORAGE),
+)
+
+_PROBE = """
+import runpy, sys, time
+target = sys.argv[1]
+before = set(sys.modules)
+start = time.perf_counter()
+if target.endswith(".py"):
+    runpy.run_path(target)
+else:
+    __import__(target)
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(" ".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def measure_import(target: str, runs: int = 5) -> tuple[float, set[str]]:
+    """Best cold import time in seconds and the modules the import loaded."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    best = float("inf")
+    loaded: set[str] = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE, target],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        best = min(best, float(output[0]))
+        loaded = set(output[1].split()) if len(output) > 1 else set()
+    return best, loaded
+
+
+def check_budgets(budgets: tuple[Budget, ...] = BUDGETS, runs: int = 5) -> list[str]:
+    failures: list[str] = []
+    for budget in budgets:
+        seconds, loaded = measure_import(budget.target, runs)
+        print(f"{budget.target}: {seconds * 1e3:.1f} ms (budget {budget.max_ms:.0f} ms)", file=sys.stderr)
+        if seconds * 1e3 > budget.max_ms:
+            failures.append(f"{budget.target} took {seconds * 1e3:.1f} ms, over its {budget.max_ms:.0f} ms budget")
+        unexpected = sorted(budget.forbidden & loaded)
+        if unexpected:
+            failures.append(f"{budget.target} imports {', '.join(unexpected)}")
+    return failures
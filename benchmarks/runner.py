@@ -0,0 +1,174 @@
+"""Benchmark cases and the timing loop."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import datetime as dt
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from benchmarks.corpus import CorpusSpec, generate_corpus, generate_history
+from promptforge import __version__, api_utils, storage
+from promptforge.lint import Linter
+from promptforge.rules import RULES, rule_set_fingerprint
+
+RESULTS_FORMAT = 1
+HISTORY_SIZES = (10, 100, 1000)
+QUICK_HISTORY_SIZES = (10, 100)
+# Concurrent savers in the burst benchmark, like the web server's worker threads.
+SAVE_BURST_THREADS = 16
+SAVE_BURST_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    run: Callable[[], object]
+    # Runs untimed before every repetition, e.g. to drop caches.
+    setup: Callable[[], object] | None = None
+    # Operations performed by one call of ``run``; timings are reported per operation.
+    ops: int = 1
+
+
+def time_case(case: Case, repeat: int, min_time: float = 0.0) -> dict:
+    samples: list[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < repeat or time.perf_counter() < deadline:
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        samples.append((time.perf_counter() - start) / case.ops)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "runs": len(samples),
+        "ops": case.ops,
+    }
+
+
+def lint_cases(spec: CorpusSpec) -> Iterator[Case]:
+    corpus = generate_corpus(spec)
+    for rule in RULES:
+        yield Case(
+            f"rule.{rule.rule_id}.check", lambda rule=rule: [rule.check(text) for text in corpus], ops=len(corpus)
+        )
+    linter = Linter()
+    yield Case("linter.lint", lambda: [linter.lint(text) for text in corpus], ops=len(corpus))
+    fail_fast = Linter(max_issues=1)
+    yield Case("linter.lint.fail_fast", lambda: [fail_fast.lint(text) for text in corpus], ops=len(corpus))
+    large = "".join(corpus)
+    yield Case("linter.lint.large", lambda: linter.lint(large))
+
+
+def storage_cases(directory: Path, history_sizes: tuple[int, ...], spec: CorpusSpec) -> Iterator[Case]:
+    [base] = generate_corpus(CorpusSpec(documents=1, lines=spec.lines * 5, seed=spec.seed))
+    start = dt.datetime(2024, 1, 1)
+    for size in history_sizes:
+        history = generate_history(base, size, seed=spec.seed)
+
+        def select(size: int = size) -> storage.VersionStore:
+            storage.DATA_DIR = directory / f"history-{size}"
+            return storage.get_store()
+
+        def cold(size: int = size) -> None:
+            select(size).clear_cache()
+            api_utils._diff_cache.clear()
+
+        ids: list[str] = []
+        store = select(size)
+        for index, text in enumerate(history):
+            timestamp = (start + dt.timedelta(seconds=index)).strftime("%Y%m%d%H%M%S")
+            ids.append(f"{timestamp}_bench.txt")
+            store.save(ids[-1], "bench", timestamp, text)
+        latest = ids[-1]
+        middle = ids[len(ids) // 2]
+        edited = history[-1] + "Respond in three bullet points.\n"
+        yield Case(f"storage.list_versions.h{size}", lambda: storage.list_versions(label="bench"), setup=select)
+        yield Case(f"storage.list_versions.page.h{size}", lambda: storage.list_versions(limit=20), setup=select)
+        yield Case(f"storage.load_text.cold.h{size}", lambda latest=latest: storage.load_text(latest), setup=cold)
+        yield Case(f"storage.load_text.warm.h{size}", lambda latest=latest: storage.load_text(latest), setup=select)
+        yield Case(
+            f"api.diff_versions_payload.line.h{size}",
+            lambda middle=middle, latest=latest: api_utils.diff_versions_payload(middle, latest),
+            setup=cold,
+        )
+        yield Case(
+            f"api.diff_versions_payload.word.h{size}",
+            lambda middle=middle, latest=latest: api_utils.diff_versions_payload(middle, latest, "word"),
+            setup=cold,
+        )
+        # Last, since each save adds to the history the other cases read.
+        yield Case(f"storage.save_version.h{size}", lambda: storage.save_version("bench", edited), setup=select)
+        yield Case(
+            f"storage.save_version.burst.h{size}",
+            lambda: _save_burst(edited),
+            setup=select,
+            ops=SAVE_BURST_SIZE,
+        )
+
+
+def _save_burst(text: str) -> None:
+    with ThreadPoolExecutor(SAVE_BURST_THREADS) as pool:
+        list(pool.map(lambda index: storage.save_version(f"bench-{index % 4}", text), range(SAVE_BURST_SIZE)))
+
+
+def run_benchmarks(
+    spec: CorpusSpec,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    history_sizes: tuple[int, ...] = HISTORY_SIZES,
+    name_filter: str | None = None,
+    progress: Callable[[str, dict], None] | None = None,
+) -> dict:
+    results: dict[str, dict] = {}
+    previous_dir = storage.DATA_DIR
+    with tempfile.TemporaryDirectory(prefix="promptforge-bench-") as tmp:
+        try:
+            cases = [*lint_cases(spec), *storage_cases(Path(tmp), history_sizes, spec)]
+            for case in cases:
+                if name_filter and name_filter not in case.name:
+                    continue
+                results[case.name] = time_case(case, repeat, min_time)
+                if progress is not None:
+                    progress(case.name, results[case.name])
+        finally:
+            storage.DATA_DIR = previous_dir
+    return {
+        "format": RESULTS_FORMAT,
+        "promptforge": __version__,
+        "rule_set": rule_set_fingerprint(RULES),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "corpus": asdict(spec),
+        "history_sizes": list(history_sizes),
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """Per-benchmark median ratios; ``regression`` is set when current is slower than allowed."""
+    rows: list[dict] = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base["median"]:
+            continue
+        ratio = result["median"] / base["median"]
+        rows.append(
+            {
+                "name": name,
+                "baseline": base["median"],
+                "current": result["median"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
@@ -1,16 +1,126 @@
-"""Utility helpers for API handlers."""
+"""Utility helpers for API handlers.
+
+Each serverless handler is a cold process, so this module only imports what
+every handler needs. The linter, rules, storage and diff modules are imported
+inside the functions that use them.
+"""
 
 from __future__ import annotations
 
-from dataclasses import asdict
-import difflib
+import codecs
+import hashlib
 import json
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, Iterator, Mapping
+from urllib.parse import parse_qs, urlparse
+
+from promptforge import metrics
+from promptforge.lru import LRUCache
+
+if TYPE_CHECKING:
+    from promptforge.lint import Linter
+    from promptforge.session import SessionStore
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+_READ_SIZE = 64 * 1024
+_FLUSH_SIZE = 16 * 1024
+_WHITESPACE = frozenset(" \t\r\n")
+# A decode error this close to the end of the buffer may be a token cut off by the read.
+_TOKEN_TAIL = 32
+
+DIFF_GRANULARITIES = ("line", "word")
+SEARCH_PAGE_SIZE = 20
+# Rules only change with a deploy; listings and pages must be revalidated every time.
+RULES_CACHE_CONTROL = "public, max-age=300"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Smaller bodies are sent as-is; compression would barely shrink them.
+COMPRESS_MIN_BYTES = 1024
+# Generated by ``python -m promptforge.build`` so /api/rules never loads the rules.
+RULES_JSON = Path(__file__).resolve().parent / "web_assets" / "rules.json"
+
+_linter: Linter | None = None
+# Linters for requests that narrow the rule set or cap the issue count.
+_configured_linters: LRUCache[Linter] = LRUCache(32)
+_sessions: SessionStore | None = None
+# Saved versions are immutable, so a diff is fully determined by its id pair.
+_diff_cache: LRUCache[dict] = LRUCache(256)
+# Serialized /lint responses keyed by rule-set fingerprint and text hash.
+lint_cache: LRUCache[bytes] = LRUCache(1024)
+# Encoded bodies of validated GET responses keyed by entity tag and content coding.
+_encoded_cache: LRUCache[tuple[str, str | None, bytes]] = LRUCache(64)
+
+
+def _cache_metrics() -> Iterator[str]:
+    caches = (("lint", lint_cache), ("diff", _diff_cache), ("encoded", _encoded_cache))
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("coalesced", "counter"), ("size", "gauge")):
+        name = f"promptforge_response_cache_{field}" + ("_total" if kind == "counter" else "")
+        yield f"# TYPE {name} {kind}"
+        for cache_name, cache in caches:
+            yield f'{name}{{cache="{cache_name}"}} {cache.stats()[field]}'
+
+
+metrics.register_collector(_cache_metrics)
+
+
+def get_linter() -> Linter:
+    global _linter
+    if _linter is None:
+        from promptforge.lint import Linter
+
+        _linter = Linter()
+    return _linter
+
+
+def _rule_id_list(value: object, name: str) -> tuple[str, ...] | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{name} must be a list of rule ids or a comma-separated string")
+    return tuple(sorted({item.strip().upper() for item in value if item.strip()}))
+
+
+def linter_for(options: Mapping[str, object]) -> Linter:
+    """The linter for a request's ``select``, ``ignore`` and ``max_issues`` options.
+
+    Options come from a JSON body or a query string, so rule ids may be a list
+    or a comma-separated string. Raises ``ValueError`` for malformed options or
+    unknown rule ids.
+    """
+    select = _rule_id_list(options.get("select"), "select")
+    ignore = _rule_id_list(options.get("ignore"), "ignore")
+    max_issues = options.get("max_issues")
+    if isinstance(max_issues, str):
+        # Query strings carry it as text.
+        max_issues = int(max_issues) if max_issues.isdigit() else max_issues or None
+    if max_issues is not None and (
+        isinstance(max_issues, bool) or not isinstance(max_issues, int) or max_issues < 1
+    ):
+        raise ValueError("max_issues must be a positive integer")
+    if select is None and ignore is None and max_issues is None:
+        return get_linter()
+
+    key = (select, ignore, max_issues)
+    linter = _configured_linters.get(key)
+    if linter is None:
+        from promptforge.lint import Linter
 
-from promptforge.lint import Linter
-from promptforge.rules import RULES
-from promptforge.storage import list_versions, load_text, save_version
+        # Unknown rule ids raise here, before anything is cached.
+        linter = Linter(select=select, ignore=ignore, max_issues=max_issues)
+        _configured_linters.put(key, linter)
+    return linter
+
+
+def get_sessions() -> SessionStore:
+    global _sessions
+    if _sessions is None:
+        from promptforge.session import SessionStore
+
+        _sessions = SessionStore(get_linter())
+    return _sessions
 
 
 def read_json(handler: BaseHTTPRequestHandler) -> dict:
@@ -22,7 +132,10 @@ def read_json(handler: BaseHTTPRequestHandler) -> dict:
 
 
 def write_json(handler: BaseHTTPRequestHandler, payload: dict, status: int = 200) -> None:
-    data = json.dumps(payload).encode("utf-8")
+    write_json_bytes(handler, json.dumps(payload).encode("utf-8"), status)
+
+
+def write_json_bytes(handler: BaseHTTPRequestHandler, data: bytes, status: int = 200) -> None:
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(data)))
@@ -30,41 +143,566 @@ def write_json(handler: BaseHTTPRequestHandler, payload: dict, status: int = 200
     handler.wfile.write(data)
 
 
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _content_coding(accept_encoding: str) -> str | None:
+    # Picks br or gzip from Accept-Encoding, honouring q-values (q=0 refuses a coding).
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for coding in ("br", "gzip"):
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality and (coding != "br" or _brotli() is not None):
+            best, best_quality = coding, quality
+    return best
+
+
+def _encode(data: bytes, coding: str | None) -> bytes:
+    if coding == "br":
+        return _brotli().compress(data)
+    if coding == "gzip":
+        import gzip
+
+        # A fixed mtime keeps the bytes, and so the strong validator, stable.
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def _matching_etag(if_none_match: str, candidates: tuple[str, ...]) -> str | None:
+    if if_none_match.strip() == "*":
+        return candidates[0]
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in candidates:
+            return tag
+    return None
+
+
+def write_cached(
+    handler: BaseHTTPRequestHandler,
+    tag: str,
+    render: Callable[[], tuple[bytes, int]],
+    content_type: str = "application/json",
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+) -> None:
+    """Answer a GET whose body is fully determined by ``tag``.
+
+    ``If-None-Match`` is checked before ``render`` runs, so a matching request
+    costs neither the payload nor its compression. Bodies of at least
+    ``COMPRESS_MIN_BYTES`` are compressed per ``Accept-Encoding`` and each
+    coding gets its own strong ETag. Non-200 bodies are sent uncached.
+    """
+    coding = _content_coding(handler.headers.get("Accept-Encoding", ""))
+    identity = f'"{tag}"'
+    candidates = (f'"{tag}-{coding}"', identity) if coding else (identity,)
+    etag = _matching_etag(handler.headers.get("If-None-Match", ""), candidates)
+    if etag is not None:
+        handler.send_response(HTTPStatus.NOT_MODIFIED)
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", cache_control)
+        handler.send_header("Vary", "Accept-Encoding")
+        handler.end_headers()
+        return
+    cached = _encoded_cache.get((tag, coding))
+    if cached is None:
+        body, status = render()
+        if status != HTTPStatus.OK:
+            write_json_bytes(handler, body, status)
+            return
+        if len(body) < COMPRESS_MIN_BYTES:
+            cached = (identity, None, body)
+        else:
+            cached = (candidates[0], coding, _encode(body, coding))
+        _encoded_cache.put((tag, coding), cached)
+    etag, used_coding, data = cached
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(data)))
+    handler.send_header("ETag", etag)
+    handler.send_header("Cache-Control", cache_control)
+    handler.send_header("Vary", "Accept-Encoding")
+    if used_coding:
+        handler.send_header("Content-Encoding", used_coding)
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+class _RecordReader:
+    """Incremental reads of a request body for ``iter_json_records``."""
+
+    def __init__(self, stream: BinaryIO, length: int) -> None:
+        self.stream = stream
+        self.remaining = length
+        self.buffer = ""
+        self.position = 0
+        self.read_size = _READ_SIZE
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        data = self.stream.read(min(self.read_size, self.remaining))
+        self.remaining = self.remaining - len(data) if data else 0
+        self.buffer = self.buffer[self.position :] + self._text_decoder.decode(data, final=self.remaining <= 0)
+        self.position = 0
+        return True
+
+    def peek(self) -> str | None:
+        """The next non-whitespace character, or None at the end of the body."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return None
+
+    def _truncated(self, error: json.JSONDecodeError) -> bool:
+        # Raw newlines cannot occur inside a JSON token, so an error followed by
+        # one is in data already read. Otherwise the record may just be cut off:
+        # inside a string, or in a token split across two reads.
+        tail = self.buffer[error.pos :]
+        if "\n" in tail:
+            return False
+        return error.msg.startswith("Unterminated string") or len(tail) < _TOKEN_TAIL
+
+    def decode(self) -> object:
+        self.peek()
+        while True:
+            try:
+                record, self.position = self._decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as exc:
+                if not self._truncated(exc) or not self._fill():
+                    raise
+                # Grow reads while a record is incomplete to avoid re-parsing it many times.
+                self.read_size *= 2
+            else:
+                self.read_size = _READ_SIZE
+                return record
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.position)
+
+    def discard(self) -> None:
+        # Consume the unread body so a keep-alive connection stays in sync.
+        self.buffer, self.position = "", 0
+        while self.remaining > 0:
+            data = self.stream.read(min(_READ_SIZE, self.remaining))
+            self.remaining = self.remaining - len(data) if data else 0
+
+
+def iter_json_records(stream: BinaryIO, length: int) -> Iterator[object]:
+    """Decode a JSON array or newline-delimited JSON body one record at a time.
+
+    Only the record being decoded is held in memory. Malformed input raises
+    ``json.JSONDecodeError`` as soon as it has been read, and the rest of the
+    body is discarded.
+    """
+    reader = _RecordReader(stream, length)
+    try:
+        first = reader.peek()
+        if first is None:
+            return
+        if first != "[":
+            while reader.peek() is not None:
+                yield reader.decode()
+            return
+        reader.position += 1
+        if reader.peek() == "]":
+            reader.position += 1
+        else:
+            while True:
+                yield reader.decode()
+                separator = reader.peek()
+                if separator not in (",", "]"):
+                    raise reader.error("Expecting ',' or ']'")
+                reader.position += 1
+                if separator == "]":
+                    break
+        if reader.peek() is not None:
+            raise reader.error("Extra data")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        reader.discard()
+        raise
+
+
+def lint_batch_lines(records: Iterable[object], linter: Linter | None = None) -> Iterator[str]:
+    from promptforge.serialize import encode_lint_record
+
+    linter = linter or get_linter()
+    try:
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                yield json.dumps({"id": index, "error": "Record must be an object"}) + "\n"
+                continue
+            record_id = record.get("id", index)
+            text = record.get("text", "")
+            if not isinstance(text, str):
+                yield json.dumps({"id": record_id, "error": "Record text must be a string"}) + "\n"
+                continue
+            yield encode_lint_record(record_id, linter.lint(text)) + "\n"
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # Headers are already sent, so report the broken input in-band and stop.
+        yield json.dumps({"error": "Invalid JSON"}) + "\n"
+
+
+def write_ndjson(handler: BaseHTTPRequestHandler, lines: Iterable[str]) -> None:
+    chunked = handler.request_version == "HTTP/1.1" and handler.protocol_version == "HTTP/1.1"
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", NDJSON_CONTENT_TYPE)
+    if chunked:
+        handler.send_header("Transfer-Encoding", "chunked")
+    else:
+        # Without chunked encoding the end of the body is signalled by closing the connection.
+        handler.send_header("Connection", "close")
+        handler.close_connection = True
+    handler.end_headers()
+
+    pending: list[str] = []
+    pending_size = 0
+
+    def flush() -> None:
+        data = "".join(pending).encode("utf-8")
+        pending.clear()
+        if not data:
+            return
+        if chunked:
+            handler.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+        else:
+            handler.wfile.write(data)
+
+    for line in lines:
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= _FLUSH_SIZE:
+            flush()
+            pending_size = 0
+    flush()
+    if chunked:
+        handler.wfile.write(b"0\r\n\r\n")
+
+
 def lint_payload(text: str) -> dict:
-    linter = Linter()
-    issues = [asdict(issue) for issue in linter.lint(text)]
-    return {"issues": issues}
+    from promptforge.serialize import issue_dict
+
+    return {"issues": [issue_dict(issue) for issue in get_linter().lint(text)]}
+
+
+def lint_response(text: str, linter: Linter | None = None) -> bytes:
+    linter = linter or get_linter()
+    key = (linter.fingerprint, linter.max_issues, hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest())
+    from promptforge.serialize import encode_lint_payload
+
+    return lint_cache.get_or_compute(key, lambda: encode_lint_payload(linter.lint(text)))
+
+
+def _session_payload(session_id: str, session) -> dict:
+    from promptforge.serialize import issue_dict
+
+    return {
+        "session": session_id,
+        "version": session.version,
+        "issues": [issue_dict(issue) for issue in session.issues()],
+    }
+
+
+def open_session_payload(payload: Mapping[str, object]) -> tuple[dict, int]:
+    text = payload.get("text", "")
+    if not isinstance(text, str):
+        return {"error": "text must be a string"}, HTTPStatus.BAD_REQUEST
+    session_id, session = get_sessions().open(text)
+    with session.lock:
+        return _session_payload(session_id, session), HTTPStatus.OK
+
+
+def _position(value: object) -> tuple[int, int]:
+    if not isinstance(value, Mapping):
+        raise ValueError("Edit positions must be objects with line and column")
+    line, column = value.get("line"), value.get("column")
+    if not isinstance(line, int) or not isinstance(column, int):
+        raise ValueError("Edit positions must be objects with line and column")
+    return line, column
+
+
+def edit_session_payload(payload: Mapping[str, object]) -> tuple[dict, int]:
+    session_id = payload.get("session")
+    session = get_sessions().get(session_id) if isinstance(session_id, str) else None
+    if session is None:
+        return {"error": "Unknown or expired session"}, HTTPStatus.NOT_FOUND
+    edits = payload.get("edits", [])
+    if not isinstance(edits, list):
+        return {"error": "edits must be a list"}, HTTPStatus.BAD_REQUEST
+    with session.lock:
+        expected = payload.get("version")
+        if expected is not None and expected != session.version:
+            return {"error": "Version mismatch", "version": session.version}, HTTPStatus.CONFLICT
+        for edit in edits:
+            try:
+                if not isinstance(edit, Mapping) or not isinstance(edit.get("text", ""), str):
+                    raise ValueError("Each edit needs start, end and text")
+                session.apply_edit(_position(edit.get("start")), _position(edit.get("end")), edit.get("text", ""))
+            except ValueError as exc:
+                # Edits before the bad one stay applied; the version tells the client where it stands.
+                return {"error": str(exc), "version": session.version}, HTTPStatus.BAD_REQUEST
+        return _session_payload(session_id, session), HTTPStatus.OK
+
+
+def close_session_payload(payload: Mapping[str, object]) -> tuple[dict, int]:
+    session_id = payload.get("session")
+    if not isinstance(session_id, str) or not get_sessions().close(session_id):
+        return {"error": "Unknown or expired session"}, HTTPStatus.NOT_FOUND
+    return {"closed": session_id}, HTTPStatus.OK
 
 
 def rules_payload() -> dict:
+    from promptforge.rules import RULES
+
     return {
         "rules": [
             {"rule_id": rule.rule_id, "name": rule.name, "description": rule.description}
             for rule in RULES
-        ]
+        ],
     }
 
 
-def list_versions_payload() -> dict:
-    return {"versions": list_versions()}
+_rules_json: tuple[bytes, str] | None = None
+
+
+def _rules() -> tuple[bytes, str]:
+    global _rules_json
+    if _rules_json is None:
+        try:
+            data = RULES_JSON.read_bytes()
+        except FileNotFoundError:
+            data = json.dumps(rules_payload()).encode("utf-8")
+        _rules_json = (data, hashlib.sha256(data).hexdigest()[:16])
+    return _rules_json
+
+
+def rules_response() -> bytes:
+    return _rules()[0]
+
+
+def write_rules(handler: BaseHTTPRequestHandler) -> None:
+    # Tagged by a hash of the body, which changes whenever a listed rule does.
+    write_cached(
+        handler,
+        f"rules-{_rules()[1]}",
+        lambda: (rules_response(), HTTPStatus.OK),
+        cache_control=RULES_CACHE_CONTROL,
+    )
+
+
+def list_versions_payload(query: Mapping[str, str] | None = None) -> tuple[dict, int]:
+    from promptforge.storage import list_versions
+
+    query = query or {}
+    try:
+        limit = int(query["limit"]) if query.get("limit") else None
+        offset = int(query.get("offset") or 0)
+        if (limit is not None and limit < 1) or offset < 0:
+            raise ValueError
+    except ValueError:
+        return {"error": "limit must be a positive integer and offset non-negative"}, HTTPStatus.BAD_REQUEST
+    try:
+        # Ask for one extra row to learn whether another page exists.
+        versions = list_versions(
+            label=query.get("label") or None,
+            since=query.get("since") or None,
+            until=query.get("until") or None,
+            limit=None if limit is None else limit + 1,
+            offset=offset,
+        )
+    except ValueError:
+        return {"error": "since and until must be ISO-8601 timestamps"}, HTTPStatus.BAD_REQUEST
+    payload: dict = {"versions": versions}
+    if limit is not None:
+        payload["versions"] = versions[:limit]
+        payload["next_offset"] = offset + limit if len(versions) > limit else None
+    return payload, HTTPStatus.OK
+
+
+def write_store_query(
+    handler: BaseHTTPRequestHandler, name: str, payload: Callable[[Mapping[str, str]], tuple[dict, int]]
+) -> None:
+    """Serve a GET answered from the version store, validated by its write generation."""
+    from promptforge.storage import store_generation
+
+    query = query_params(handler.path)
+    # Tagged by the store's write generation and the query, so an unchanged
+    # answer is sent again (or confirmed with a 304) without recomputing it.
+    digest = hashlib.sha256(json.dumps(sorted(query.items())).encode("utf-8")).hexdigest()[:16]
+
+    def render() -> tuple[bytes, int]:
+        body, status = payload(query)
+        return json.dumps(body).encode("utf-8"), status
+
+    write_cached(handler, f"{name}-{store_generation()}-{digest}", render)
+
+
+def write_versions_list(handler: BaseHTTPRequestHandler) -> None:
+    write_store_query(handler, "versions", list_versions_payload)
+
+
+def _threshold(query: Mapping[str, str]) -> float:
+    from promptforge.similarity import DEFAULT_THRESHOLD
+
+    threshold = float(query.get("threshold") or DEFAULT_THRESHOLD)
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError
+    return threshold
+
+
+def similar_versions_payload(query: Mapping[str, str]) -> tuple[dict, int]:
+    from promptforge.storage import similar_versions
+
+    file_id = query.get("id")
+    if not file_id:
+        return {"error": "id is required"}, HTTPStatus.BAD_REQUEST
+    try:
+        threshold = _threshold(query)
+    except ValueError:
+        return {"error": "threshold must be a number in (0, 1]"}, HTTPStatus.BAD_REQUEST
+    try:
+        limit = int(query["limit"]) if query.get("limit") else None
+        if limit is not None and limit < 1:
+            raise ValueError
+    except ValueError:
+        return {"error": "limit must be a positive integer"}, HTTPStatus.BAD_REQUEST
+    try:
+        similar = similar_versions(file_id, threshold, limit)
+    except ValueError:
+        return {"error": "Invalid version id"}, HTTPStatus.BAD_REQUEST
+    except FileNotFoundError:
+        return {"error": "Version not found"}, HTTPStatus.NOT_FOUND
+    return {"id": file_id, "threshold": threshold, "similar": similar}, HTTPStatus.OK
+
+
+def clusters_payload(query: Mapping[str, str]) -> tuple[dict, int]:
+    from promptforge.storage import version_clusters
+
+    try:
+        threshold = _threshold(query)
+    except ValueError:
+        return {"error": "threshold must be a number in (0, 1]"}, HTTPStatus.BAD_REQUEST
+    return {"threshold": threshold, "clusters": version_clusters(threshold)}, HTTPStatus.OK
+
+
+def search_versions_payload(query: Mapping[str, str]) -> tuple[dict, int]:
+    from promptforge.snapshots import search
+
+    text = query.get("q", "")
+    try:
+        limit = int(query.get("limit") or SEARCH_PAGE_SIZE)
+        offset = int(query.get("offset") or 0)
+        if limit < 1 or offset < 0:
+            raise ValueError
+    except ValueError:
+        return {"error": "limit must be a positive integer and offset non-negative"}, HTTPStatus.BAD_REQUEST
+    try:
+        # One extra row tells whether another page exists.
+        results = search(get_linter(), text, limit + 1, offset)
+    except ValueError as exc:
+        return {"error": str(exc)}, HTTPStatus.BAD_REQUEST
+    return {
+        "query": text,
+        "results": results[:limit],
+        "next_offset": offset + limit if len(results) > limit else None,
+    }, HTTPStatus.OK
+
+
+def blame_payload(query: Mapping[str, str]) -> tuple[dict, int]:
+    from promptforge.storage import blame_label
+
+    label = query.get("label")
+    if not label:
+        return {"error": "label is required"}, HTTPStatus.BAD_REQUEST
+    try:
+        return blame_label(label), HTTPStatus.OK
+    except FileNotFoundError:
+        return {"error": "No versions with that label"}, HTTPStatus.NOT_FOUND
+
+
+def write_similar_versions(handler: BaseHTTPRequestHandler) -> None:
+    write_store_query(handler, "similar", similar_versions_payload)
+
+
+def write_version_clusters(handler: BaseHTTPRequestHandler) -> None:
+    write_store_query(handler, "clusters", clusters_payload)
+
+
+def write_blame(handler: BaseHTTPRequestHandler) -> None:
+    write_store_query(handler, "blame", blame_payload)
+
+
+def write_version_search(handler: BaseHTTPRequestHandler) -> None:
+    # Rule terms depend on the rule set as well as the store.
+    write_store_query(handler, f"search-{get_linter().fingerprint}", search_versions_payload)
+
+
+def query_params(path: str) -> dict[str, str]:
+    return {key: values[-1] for key, values in parse_qs(urlparse(path).query).items()}
 
 
 def save_version_payload(label: str, text: str) -> dict:
+    from promptforge.snapshots import take_snapshot
+    from promptforge.storage import save_version
+
     if not label:
         return {"error": "Label is required"}
-    file_id = save_version(label, text)
+    # Linted once now, so diffs can compare issues without re-linting.
+    file_id = save_version(label, text, take_snapshot(get_linter(), text))
     return {"id": file_id}
 
 
-def diff_versions_payload(file_a: str | None, file_b: str | None) -> tuple[dict, int]:
+def diff_versions_payload(
+    file_a: str | None, file_b: str | None, granularity: str = "line"
+) -> tuple[dict, int]:
     if not file_a or not file_b:
         return {"error": "Both version ids are required"}, HTTPStatus.BAD_REQUEST
+    if granularity not in DIFF_GRANULARITIES:
+        return {"error": "granularity must be 'line' or 'word'"}, HTTPStatus.BAD_REQUEST
+    key = (file_a, file_b, granularity)
+    cached = _diff_cache.get(key)
+    if cached is not None:
+        return cached, HTTPStatus.OK
+    from promptforge.diff import line_hunks, split_lines, unified_diff, word_segments
+    from promptforge.snapshots import issue_delta, version_issues
+    from promptforge.storage import load_text
+
     try:
-        text_a = load_text(file_a).splitlines(keepends=True)
-        text_b = load_text(file_b).splitlines(keepends=True)
+        text_a = load_text(file_a)
+        text_b = load_text(file_b)
     except ValueError:
         return {"error": "Invalid version id"}, HTTPStatus.BAD_REQUEST
     except FileNotFoundError:
         return {"error": "Version not found"}, HTTPStatus.NOT_FOUND
-    diff = difflib.unified_diff(text_a, text_b, fromfile=file_a, tofile=file_b)
-    return {"diff": "".join(diff)}, HTTPStatus.OK
+    if granularity == "word":
+        payload = {"segments": word_segments(text_a, text_b)}
+    else:
+        lines_a, lines_b = split_lines(text_a), split_lines(text_b)
+        payload = {
+            "diff": unified_diff(lines_a, lines_b, fromfile=file_a, tofile=file_b),
+            "hunks": line_hunks(lines_a, lines_b),
+        }
+    linter = get_linter()
+    issues = version_issues(linter, {file_a: text_a, file_b: text_b})
+    payload["issues"] = {"fingerprint": linter.fingerprint, **issue_delta(issues[file_a], issues[file_b])}
+    _diff_cache.put(key, payload)
+    return payload, HTTPStatus.OK
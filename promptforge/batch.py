@@ -0,0 +1,166 @@
+"""Batch linting of many prompt files for the CLI."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from functools import partial
+import glob
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from promptforge.cache import LintCache, cache_key
+from promptforge.issues import Issue, IssueColumns
+from promptforge.lint import Linter
+
+PROMPT_SUFFIXES = (".txt",)
+_GLOB_CHARS = frozenset("*?[")
+
+_CACHE_FLUSH_SIZE = 500
+
+# Rule selection and issue limit a linter was built with: (select, ignore, max_issues).
+LintConfig = tuple[tuple[str, ...] | None, tuple[str, ...] | None, int | None]
+DEFAULT_CONFIG: LintConfig = (None, None, None)
+
+_linters: dict[LintConfig, Linter] = {}
+_caches: dict[Path, LintCache] = {}
+
+
+@dataclass(frozen=True)
+class FileResult:
+    path: Path
+    # Columnar when the result came back from a worker process.
+    issues: tuple[Issue, ...] | IssueColumns = ()
+    error: str | None = None
+    cache_key: str | None = None
+    cached: bool = False
+
+
+def expand_paths(arguments: Iterable[str]) -> list[Path]:
+    paths: list[Path] = []
+    seen: set[Path] = set()
+
+    def add(path: Path) -> None:
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+    for argument in arguments:
+        path = Path(argument)
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix in PROMPT_SUFFIXES:
+                    add(child)
+        elif not path.exists() and _GLOB_CHARS.intersection(argument):
+            for match in sorted(glob.glob(argument, recursive=True)):
+                if Path(match).is_file():
+                    add(Path(match))
+        else:
+            # Missing plain paths are kept so the caller reports them.
+            add(path)
+    return paths
+
+
+def _get_linter(config: LintConfig = DEFAULT_CONFIG) -> Linter:
+    linter = _linters.get(config)
+    if linter is None:
+        select, ignore, max_issues = config
+        linter = _linters[config] = Linter(select=select, ignore=ignore, max_issues=max_issues)
+    return linter
+
+
+def _get_cache(directory: Path) -> LintCache:
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = LintCache(directory)
+    return cache
+
+
+def lint_file(path: Path, cache_dir: Path | None = None, config: LintConfig = DEFAULT_CONFIG) -> FileResult:
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return FileResult(path, error=f"file not found: {path}")
+    except OSError as exc:
+        return FileResult(path, error=f"cannot read {path}: {exc.strerror}")
+
+    key = None
+    if cache_dir is not None:
+        # Hash the raw bytes so warm hits skip decoding as well as linting.
+        linter = _get_linter(config)
+        key = cache_key(data, linter.fingerprint)
+        issues = _get_cache(cache_dir).get(key)
+        if issues is not None:
+            if linter.max_issues is not None:
+                issues = issues[: linter.max_issues]
+            return FileResult(path, issues=issues, cache_key=key, cached=True)
+
+    return lint_data(path, data, key, config)
+
+
+def lint_data(path: Path, data: bytes, key: str | None = None, config: LintConfig = DEFAULT_CONFIG) -> FileResult:
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return FileResult(path, error=f"file is not valid UTF-8: {path}")
+    linter = _get_linter(config)
+    issues = tuple(linter.lint(content))
+    if linter.max_issues is not None and len(issues) >= linter.max_issues:
+        # Possibly cut short, so it must not be cached as the file's full result.
+        key = None
+    return FileResult(path, issues=issues, cache_key=key)
+
+
+def _lint_file_columnar(path: Path, cache_dir: Path | None, config: LintConfig) -> FileResult:
+    # Worker side of the pool: columns pickle far smaller and faster than Issue objects.
+    result = lint_file(path, cache_dir, config)
+    if not result.issues:
+        return result
+    return replace(result, issues=IssueColumns.from_issues(result.issues))
+
+
+def _lint_all(
+    paths: list[Path], jobs: int, cache_dir: Path | None, config: LintConfig
+) -> Iterator[FileResult]:
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(partial(lint_file, cache_dir=cache_dir, config=config), paths)
+        return
+    worker = partial(_lint_file_columnar, cache_dir=cache_dir, config=config)
+    # Imported here so single-process runs skip loading multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(jobs, len(paths))
+    # Small chunks keep output streaming while amortizing the IPC per file.
+    chunksize = max(1, min(32, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            yield from pool.map(worker, paths, chunksize=chunksize)
+        finally:
+            # A caller that stops early (--max-issues) should not wait for the rest.
+            pool.shutdown(cancel_futures=True)
+
+
+def lint_files(
+    paths: list[Path], jobs: int = 1, cache_dir: Path | None = None, config: LintConfig = DEFAULT_CONFIG
+) -> Iterator[FileResult]:
+    if cache_dir is None:
+        yield from _lint_all(paths, jobs, None, config)
+        return
+    # Only this process writes to the cache; workers open their own read connections.
+    cache = LintCache(cache_dir)
+    stored: list[tuple[str, tuple[Issue, ...] | IssueColumns]] = []
+    used: list[str] = []
+    try:
+        for result in _lint_all(paths, jobs, cache_dir, config):
+            if result.cache_key is not None:
+                if result.cached:
+                    used.append(result.cache_key)
+                else:
+                    stored.append((result.cache_key, result.issues))
+                if len(stored) + len(used) >= _CACHE_FLUSH_SIZE:
+                    cache.update(stored, used)
+                    stored, used = [], []
+            yield result
+    finally:
+        # Also reached when the caller stops early, so finished results are kept.
+        cache.update(stored, used)
+        cache.close()
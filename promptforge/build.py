@@ -0,0 +1,35 @@
+"""Build step that precomputes static assets: ``python -m promptforge.build [--check]``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from promptforge.api_utils import RULES_JSON, rules_payload
+
+
+def render_rules_json() -> bytes:
+    return json.dumps(rules_payload()).encode("utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="promptforge.build", description="Precompute static API payloads.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if an asset is out of date.")
+    args = parser.parse_args(argv)
+
+    content = render_rules_json()
+    current = RULES_JSON.read_bytes() if RULES_JSON.exists() else None
+    if args.check:
+        if current != content:
+            print(f"{RULES_JSON} is out of date; run python -m promptforge.build.")
+            return 1
+        return 0
+    if current != content:
+        RULES_JSON.write_bytes(content)
+        print(f"Wrote {RULES_JSON}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Persistent lint result cache for repeated CLI runs."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import Iterable
+
+from promptforge.issues import Issue
+from promptforge.serialize import decode_issues, encode_issues
+
+CACHE_DIR = Path(os.getenv("PROMPTFORGE_CACHE_DIR", ".promptforge_cache"))
+CACHE_FILENAME = "lint.sqlite3"
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+def cache_key(data: bytes, fingerprint: str) -> str:
+    return f"{fingerprint}:{hashlib.sha256(data).hexdigest()}"
+
+
+class LintCache:
+    """SQLite-backed map from content hash plus rule-set fingerprint to issues.
+
+    Entries carry a last-used timestamp; once the table grows past
+    ``max_entries`` the least recently used rows are evicted.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = directory / CACHE_FILENAME
+        self.max_entries = max_entries
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self, create: bool) -> sqlite3.Connection | None:
+        if self._connection is not None:
+            return self._connection
+        if not create and not self.path.exists():
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            # WAL lets worker processes read while the parent writes.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS lint_cache ("
+                "key TEXT PRIMARY KEY, issues TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS lint_cache_last_used ON lint_cache (last_used)")
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._connection = connection
+        return connection
+
+    def get(self, key: str) -> tuple[Issue, ...] | None:
+        try:
+            connection = self._connect(create=False)
+            if connection is None:
+                return None
+            row = connection.execute("SELECT issues FROM lint_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return decode_issues(row[0])
+
+    def update(self, stored: Iterable[tuple[str, Iterable[Issue]]], used: Iterable[str] = ()) -> None:
+        now = time.time()
+        try:
+            connection = self._connect(create=True)
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO lint_cache (key, issues, last_used) VALUES (?, ?, ?)",
+                    ((key, encode_issues(issues), now) for key, issues in stored),
+                )
+                connection.executemany(
+                    "UPDATE lint_cache SET last_used = ? WHERE key = ?",
+                    ((now, key) for key in used),
+                )
+                (count,) = connection.execute("SELECT COUNT(*) FROM lint_cache").fetchone()
+                if count > self.max_entries:
+                    connection.execute(
+                        "DELETE FROM lint_cache WHERE key IN "
+                        "(SELECT key FROM lint_cache ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+        except sqlite3.Error:
+            # The cache is an optimization; a locked or corrupt file must not fail the lint.
+            return
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
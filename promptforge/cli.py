@@ -3,41 +3,523 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from promptforge.lint import Linter
+from promptforge import metrics
+
+if TYPE_CHECKING:
+    from promptforge.batch import FileResult
+
+# Subcommand dependencies are imported where they are used to keep start-up fast.
+
+
+def _rule_ids(value: str) -> tuple[str, ...]:
+    return tuple(rule_id.strip().upper() for rule_id in value.split(",") if rule_id.strip())
+
+
+def _add_rule_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--select",
+        type=_rule_ids,
+        metavar="IDS",
+        help="Only run these comma-separated rule ids (e.g. PF001,PF003).",
+    )
+    parser.add_argument(
+        "--ignore",
+        type=_rule_ids,
+        metavar="IDS",
+        help="Skip these comma-separated rule ids.",
+    )
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return number
+
+
+def _threshold(value: str) -> float:
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = 0.0
+    if not 0.0 < threshold <= 1.0:
+        raise argparse.ArgumentTypeError("must be a number in (0, 1]")
+    return threshold
+
+
+def _add_threshold(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold",
+        type=_threshold,
+        default=0.8,
+        help="Minimum estimated Jaccard similarity of word shingles (default: 0.8).",
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="promptforge", description="PromptForge prompt linter.")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    lint_parser = subparsers.add_parser("lint", help="Lint a prompt file.")
-    lint_parser.add_argument("file", type=Path, help="Path to the prompt text file.")
+    lint_parser = subparsers.add_parser("lint", help="Lint prompt files.")
+    lint_parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="Prompt text files, directories (searched for *.txt) or glob patterns.",
+    )
+    lint_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 uses every CPU).",
+    )
+    lint_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent lint cache (default: $PROMPTFORGE_CACHE_DIR or .promptforge_cache).",
+    )
+    lint_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lint every file without reading or writing the cache.",
+    )
+    lint_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read files in chunks and print issues as they are found (for very large files).",
+    )
+    lint_parser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        help="Characters read per chunk in --stream mode (default: 1048576).",
+    )
+    lint_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-rule timings to stderr when done (lints in-process, uncached; not with --stream or --watch).",
+    )
+    lint_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-lint files as they change (directories pick up new *.txt files).",
+    )
+    lint_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll file stats instead of using inotify (e.g. on network filesystems).",
+    )
+    _add_rule_filters(lint_parser)
+    lint_parser.add_argument(
+        "--max-issues",
+        type=int,
+        metavar="N",
+        help="Stop once N issues are found; files not yet linted are skipped.",
+    )
+    lint_parser.add_argument(
+        "--fail-fast",
+        action="store_const",
+        const=1,
+        dest="max_issues",
+        help="Stop at the first issue (same as --max-issues 1).",
+    )
+
+    jsonl_parser = subparsers.add_parser(
+        "lint-jsonl",
+        help="Lint every record of a JSONL corpus and write per-record issues as JSONL.",
+    )
+    jsonl_parser.add_argument(
+        "path",
+        nargs="?",
+        default="-",
+        help="JSONL file to read, or - for stdin (default).",
+    )
+    jsonl_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Write results to this file instead of stdout.",
+    )
+    jsonl_parser.add_argument(
+        "--field",
+        default="text",
+        help="Record field holding the prompt text (default: %(default)s).",
+    )
+    jsonl_parser.add_argument(
+        "--id-field",
+        default="id",
+        help="Record field copied into each result as its id (default: %(default)s; the line number if absent).",
+    )
+    jsonl_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 uses every CPU).",
+    )
+    _add_rule_filters(jsonl_parser)
+
+    import_parser = subparsers.add_parser(
+        "import-versions",
+        help="Import legacy one-file-per-version prompt files into the version store.",
+    )
+    import_parser.add_argument(
+        "directory",
+        type=Path,
+        nargs="?",
+        help="Directory holding <timestamp>_<label>.txt files (default: the data directory).",
+    )
+
+    similar_parser = subparsers.add_parser("similar", help="List saved versions that nearly duplicate a version.")
+    similar_parser.add_argument("id", help="Version id to compare against.")
+    _add_threshold(similar_parser)
+    similar_parser.add_argument("--limit", type=int, help="Show at most N matches.")
+
+    clusters_parser = subparsers.add_parser("clusters", help="Group saved versions that nearly duplicate each other.")
+    _add_threshold(clusters_parser)
+
+    search_parser = subparsers.add_parser("search", help="Search saved versions by text, label or lint rule.")
+    search_parser.add_argument(
+        "query",
+        help='Terms that must all match: words, "phrases", label:WORD and rule:PF003.',
+    )
+    search_parser.add_argument("--limit", type=int, default=20, help="Show at most N results (default: 20).")
+    search_parser.add_argument("--offset", type=int, default=0, help="Skip the first N results.")
+
+    blame_parser = subparsers.add_parser(
+        "blame", help="Show which saved version introduced each line of a label's latest version."
+    )
+    blame_parser.add_argument("label", help="Version label.")
 
     return parser
 
 
+def _check_rule_filters(args: argparse.Namespace) -> bool:
+    from promptforge.lint import select_rules
+    from promptforge.rules import RULES
+
+    try:
+        select_rules(RULES, args.select, args.ignore)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return False
+    return True
+
+
+def _lint_streaming(args: argparse.Namespace, paths: list[Path]) -> int:
+    from promptforge.lint import DEFAULT_CHUNK_SIZE, Linter, read_chunks
+
+    linter = Linter(select=args.select, ignore=args.ignore)
+    chunk_size = DEFAULT_CHUNK_SIZE if args.chunk_size is None else args.chunk_size
+    prefix_paths = len(paths) > 1
+    issue_count = 0
+    failed_files = 0
+    error_files = 0
+    for path in paths:
+        prefix = f"{path}: " if prefix_paths else ""
+        file_issues = 0
+        try:
+            for issue in linter.lint_stream(read_chunks(path, chunk_size)):
+                file_issues += 1
+                print(f"{prefix}{issue.format()}", flush=True)
+        except FileNotFoundError:
+            error = f"file not found: {path}"
+        except UnicodeDecodeError:
+            error = f"file is not valid UTF-8: {path}"
+        except OSError as exc:
+            error = f"cannot read {path}: {exc.strerror}"
+        else:
+            error = None
+        issue_count += file_issues
+        failed_files += bool(file_issues)
+        if error:
+            error_files += 1
+            print(f"{prefix}ERROR: {error}", flush=True)
+
+    if not prefix_paths:
+        if not issue_count and not error_files:
+            print("No lint errors found.")
+    else:
+        print(
+            f"Linted {len(paths)} files: {issue_count} issues in {failed_files} files"
+            + (f", {error_files} unreadable." if error_files else ".")
+        )
+    if error_files:
+        return 2
+    return 1 if failed_files else 0
+
+
+def _result_lines(result: FileResult) -> list[str]:
+    if result.error:
+        return [f"{result.path}: ERROR: {result.error}"]
+    return [f"{result.path}: {issue.format()}" for issue in result.issues]
+
+
+def _watch(args: argparse.Namespace, paths: list[Path]) -> int:
+    import hashlib
+    import time
+
+    from promptforge.batch import FileResult, lint_data, lint_files
+    from promptforge.cache import CACHE_DIR
+    from promptforge.watch import changes, open_watcher
+
+    roots = [Path(argument) for argument in args.paths if Path(argument).is_dir()]
+    files = [path for path in paths if not any(root in path.parents for root in roots)]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache_dir = None if args.no_cache else (args.cache_dir or CACHE_DIR)
+    config = (args.select, args.ignore, None)
+    counts: dict[Path, int] = {}
+    digests: dict[Path, bytes] = {}
+
+    def summary() -> str:
+        failed = sum(1 for count in counts.values() if count)
+        return f"Watching {len(counts)} files: {sum(counts.values())} issues in {failed} files."
+
+    for result in lint_files(paths, jobs=jobs, cache_dir=cache_dir, config=config):
+        counts[result.path] = len(result.issues)
+        for line in _result_lines(result):
+            print(line, flush=True)
+    print(summary(), flush=True)
+
+    # Every later save re-lints only the files it touched, in this warm process.
+    watcher = open_watcher(files, roots, polling=args.poll)
+    try:
+        for changed in changes(watcher):
+            lines: list[str] = []
+            for path in sorted(changed):
+                try:
+                    data = path.read_bytes()
+                except FileNotFoundError:
+                    digests.pop(path, None)
+                    if path not in files:
+                        if counts.pop(path, None) is not None:
+                            lines.append(f"{path}: removed.")
+                        continue
+                    result = FileResult(path, error=f"file not found: {path}")
+                except OSError as exc:
+                    result = FileResult(path, error=f"cannot read {path}: {exc.strerror}")
+                else:
+                    # Editors often write a file more than once per save; skip unchanged content.
+                    digest = hashlib.sha256(data).digest()
+                    if digests.get(path) == digest:
+                        continue
+                    digests[path] = digest
+                    result = lint_data(path, data, config=config)
+                counts[path] = len(result.issues)
+                lines.extend(_result_lines(result) or [f"{path}: OK"])
+            if lines:
+                print(f"[{time.strftime('%H:%M:%S')}]", *lines, summary(), sep="\n", flush=True)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+    return 0
+
+
+def _lint_jsonl(args: argparse.Namespace) -> int:
+    from contextlib import ExitStack
+
+    from promptforge.jsonl import lint_corpus
+
+    if not _check_rule_filters(args):
+        return 2
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    with ExitStack() as stack:
+        try:
+            source = sys.stdin.buffer if args.path == "-" else stack.enter_context(open(args.path, "rb"))
+            out = (
+                stack.enter_context(args.output.open("w", encoding="utf-8"))
+                if args.output is not None
+                else sys.stdout
+            )
+        except OSError as exc:
+            print(f"ERROR: cannot open {exc.filename}: {exc.strerror}", file=sys.stderr)
+            return 2
+        stats = lint_corpus(
+            source,
+            out,
+            jobs=jobs,
+            text_field=args.field,
+            id_field=args.id_field,
+            rule_filter=(args.select, args.ignore),
+        )
+    print(stats.format(), file=sys.stderr)
+    if stats.errors:
+        return 2
+    return 1 if stats.issues else 0
+
+
+def _lint(args: argparse.Namespace) -> int:
+    from promptforge.batch import expand_paths, lint_files
+    from promptforge.cache import CACHE_DIR
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("ERROR: no prompt files matched.")
+        return 2
+    if args.stream and args.watch:
+        print("ERROR: --watch cannot be combined with --stream.")
+        return 2
+    if args.max_issues is not None and (args.stream or args.watch):
+        print("ERROR: --max-issues and --fail-fast cannot be combined with --stream or --watch.")
+        return 2
+    if args.profile and (args.stream or args.watch):
+        print("ERROR: --profile cannot be combined with --stream or --watch.")
+        return 2
+    if args.max_issues is not None and args.max_issues < 1:
+        print("ERROR: --max-issues must be at least 1.")
+        return 2
+    if not _check_rule_filters(args):
+        return 2
+    if args.stream:
+        return _lint_streaming(args, paths)
+    if args.watch:
+        return _watch(args, paths)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache_dir = None if args.no_cache else (args.cache_dir or CACHE_DIR)
+    if args.profile:
+        # Timings are recorded in-process, so worker processes would lose them, and
+        # cache hits would skip the linter entirely.
+        metrics.enable()
+        jobs = 1
+        cache_dir = None
+    config = (args.select, args.ignore, args.max_issues)
+
+    if len(paths) == 1:
+        [result] = lint_files(paths, cache_dir=cache_dir, config=config)
+        if result.error:
+            print(f"ERROR: {result.error}")
+            return 2
+        if result.issues:
+            for issue in result.issues:
+                print(issue.format())
+            return 1
+        print("No lint errors found.")
+        return 0
+
+    issue_count = 0
+    failed_files = 0
+    error_files = 0
+    linted = 0
+    results = lint_files(paths, jobs=jobs, cache_dir=cache_dir, config=config)
+    for result in results:
+        linted += 1
+        if result.error:
+            error_files += 1
+            print(f"{result.path}: ERROR: {result.error}", flush=True)
+            continue
+        if result.issues:
+            issues = result.issues
+            if args.max_issues is not None:
+                issues = issues[: args.max_issues - issue_count]
+            failed_files += 1
+            issue_count += len(issues)
+            print("\n".join(f"{result.path}: {issue.format()}" for issue in issues), flush=True)
+            if args.max_issues is not None and issue_count >= args.max_issues:
+                # Nothing later can change the outcome; stop the workers too.
+                results.close()
+                break
+
+    summary = f"Linted {linted} files: {issue_count} issues in {failed_files} files"
+    if linted < len(paths):
+        summary += f", stopped after {args.max_issues} issues ({len(paths) - linted} files skipped)"
+    print(summary + (f", {error_files} unreadable." if error_files else "."))
+    if error_files:
+        return 2
+    return 1 if failed_files else 0
+
+
 def main(argv: list[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
 
     if args.command == "lint":
-        linter = Linter()
+        status = _lint(args)
+        if metrics.enabled():
+            print(metrics.format_profile(), file=sys.stderr)
+        sys.exit(status)
+
+    if args.command == "lint-jsonl":
+        sys.exit(_lint_jsonl(args))
+
+    if args.command == "import-versions":
+        from promptforge.storage import import_versions
+
+        if args.directory is not None and not args.directory.is_dir():
+            print(f"ERROR: directory not found: {args.directory}")
+            sys.exit(2)
+        count = import_versions(args.directory)
+        print(f"Imported {count} versions.")
+        sys.exit(0)
+
+    if args.command == "similar":
+        from promptforge.storage import similar_versions
+
+        if args.limit is not None and args.limit < 1:
+            parser.error("--limit must be at least 1")
         try:
-            content = args.file.read_text(encoding="utf-8")
+            matches = similar_versions(args.id, args.threshold, args.limit)
+        except ValueError:
+            print(f"ERROR: invalid version id: {args.id}")
+            sys.exit(2)
         except FileNotFoundError:
-            print(f"ERROR: file not found: {args.file}")
+            print(f"ERROR: version not found: {args.id}")
             sys.exit(2)
+        for match in matches:
+            print(f"{match['similarity']:.3f}  {match['id']}")
+        if not matches:
+            print("No similar versions found.")
+        sys.exit(0)
 
-        issues = linter.lint(content)
-        if issues:
-            for issue in issues:
-                print(issue.format())
-            sys.exit(1)
+    if args.command == "clusters":
+        from promptforge.storage import version_clusters
 
-        print("No lint errors found.")
+        clusters = version_clusters(args.threshold)
+        for index, members in enumerate(clusters, 1):
+            print(f"Cluster {index} ({len(members)} versions):")
+            for member in members:
+                print(f"  {member}")
+        if not clusters:
+            print("No near-duplicate versions found.")
+        sys.exit(0)
+
+    if args.command == "search":
+        from promptforge.lint import Linter
+        from promptforge.snapshots import search
+
+        if args.limit < 1 or args.offset < 0:
+            parser.error("--limit must be at least 1 and --offset at least 0")
+        try:
+            results = search(Linter(), args.query, args.limit, args.offset)
+        except ValueError as exc:
+            print(f"ERROR: {exc}")
+            sys.exit(2)
+        for result in results:
+            score = "" if result["score"] is None else f"{result['score']:.3g}  "
+            print(f"{score}{result['id']}")
+        if not results:
+            print("No matching versions found.")
+        sys.exit(0)
+
+    if args.command == "blame":
+        from promptforge.storage import blame_label
+
+        try:
+            blame = blame_label(args.label)
+        except FileNotFoundError:
+            print(f"ERROR: no versions with label: {args.label}")
+            sys.exit(2)
+        width = max((len(line["id"]) for line in blame["lines"]), default=0)
+        for line in blame["lines"]:
+            print(f"{line['id']:<{width}}  {line['line']:>4}  {line['text']}")
         sys.exit(0)
 
 
@@ -0,0 +1,55 @@
+"""Line-based deltas between consecutive versions of a prompt."""
+
+from __future__ import annotations
+
+import json
+import zlib
+
+from promptforge.diff import Opcode, opcodes
+
+# A delta is a list of operations applied to the base text's lines: a
+# ``[start, end]`` pair copies base lines, a string inserts new text.
+Delta = list
+
+
+def make_delta(base: str, text: str) -> Delta:
+    lines = text.splitlines(keepends=True)
+    return delta_from_opcodes(opcodes(base.splitlines(keepends=True), lines), lines)
+
+
+def delta_from_opcodes(codes: list[Opcode], lines: list[str]) -> Delta:
+    """The delta for line opcodes already computed against the base, given the new text's lines."""
+    delta: Delta = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif j1 != j2:
+            delta.append("".join(lines[j1:j2]))
+    return delta
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    base_lines = base.splitlines(keepends=True)
+    parts: list[str] = []
+    for operation in delta:
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            parts.extend(base_lines[operation[0] : operation[1]])
+    return "".join(parts)
+
+
+def encode_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"))
+
+
+def decode_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def encode_delta(delta: Delta) -> bytes:
+    return zlib.compress(json.dumps(delta, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_delta(data: bytes) -> Delta:
+    return json.loads(zlib.decompress(data))
@@ -0,0 +1,272 @@
+"""Patience diff engine with line- and word-level output."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import re
+from typing import Iterator, Sequence
+
+Opcode = tuple[str, int, int, int, int]
+
+_WORD_PATTERN = re.compile(r"\s+|\w+|[^\w\s]")
+# Regions without unique common tokens fall back to Myers' O(ND) search; past
+# this many edits the region is reported as one replacement instead.
+_MAX_FALLBACK_EDITS = 1000
+
+
+def split_lines(text: str) -> list[str]:
+    return text.splitlines(keepends=True)
+
+
+def split_words(text: str) -> list[str]:
+    return _WORD_PATTERN.findall(text)
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> tuple[list[int], list[int]]:
+    ids: dict[str, int] = {}
+    return [ids.setdefault(token, len(ids)) for token in a], [ids.setdefault(token, len(ids)) for token in b]
+
+
+def _unique_anchors(a: list[int], b: list[int], alo: int, ahi: int, blo: int, bhi: int) -> list[tuple[int, int]]:
+    # Tokens occurring exactly once on each side, as [count_a, count_b, index_a, index_b].
+    counts: dict[int, list[int]] = {}
+    for i in range(alo, ahi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, 0, i, -1]
+        else:
+            entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+    pairs = sorted((entry[2], entry[3]) for entry in counts.values() if entry[0] == 1 and entry[1] == 1)
+    if not pairs:
+        return []
+    # Patience sorting: the longest run of pairs increasing in both a and b.
+    tails: list[int] = []
+    tail_index: list[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        slot = bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+        previous[index] = tail_index[slot - 1] if slot else -1
+    anchors: list[tuple[int, int]] = []
+    index = tail_index[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(a: list[int], b: list[int], alo: int, ahi: int, blo: int, bhi: int) -> list[tuple[int, int]]:
+    n, m = ahi - alo, bhi - blo
+    v: dict[int, int] = {1: 0}
+    trace: list[dict[int, int]] = []
+    for d in range(min(n + m, _MAX_FALLBACK_EDITS) + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                trace.append(dict(v))
+                return _myers_path(trace, a, b, alo, blo, n, m)
+        trace.append(dict(v))
+    return []
+
+
+def _myers_path(
+    trace: list[dict[int, int]], a: list[int], b: list[int], alo: int, blo: int, x: int, y: int
+) -> list[tuple[int, int]]:
+    matches: list[tuple[int, int]] = []
+    for d in range(len(trace) - 1, 0, -1):
+        # The move taken in round d was chosen from the values left by round d - 1.
+        v = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        start_x = prev_x if prev_k == k + 1 else prev_x + 1
+        while x > start_x:
+            x -= 1
+            y -= 1
+            matches.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((alo + x, blo + y))
+    matches.reverse()
+    return matches
+
+
+def _matching_pairs(a: list[int], b: list[int]) -> list[tuple[int, int]]:
+    matches: list[tuple[int, int]] = []
+    # Work items are regions to diff or already-known matches; the stack is
+    # filled in reverse so matches come out in order without recursion.
+    stack: list[tuple[int, int, int, int] | tuple[int, int]] = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if len(item) == 2:
+            matches.append(item)  # type: ignore[arg-type]
+            continue
+        alo, ahi, blo, bhi = item  # type: ignore[misc]
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        suffix = 0
+        while alo < ahi - suffix and blo < bhi - suffix and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+            suffix += 1
+        stack.extend((ahi - offset, bhi - offset) for offset in range(1, suffix + 1))
+        ahi -= suffix
+        bhi -= suffix
+        if alo == ahi or blo == bhi:
+            continue
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if not anchors:
+            stack.extend(reversed(_myers(a, b, alo, ahi, blo, bhi)))
+            continue
+        ends = anchors + [(ahi, bhi)]
+        starts = [(alo, blo)] + [(i + 1, j + 1) for i, j in anchors]
+        for (i1, j1), (i2, j2) in reversed(list(zip(starts, ends))):
+            if i2 < ahi:
+                stack.append((i2, j2))
+            stack.append((i1, i2, j1, j2))
+    return matches
+
+
+def opcodes(a: Sequence[str], b: Sequence[str]) -> list[Opcode]:
+    ids_a, ids_b = _intern(a, b)
+    codes: list[Opcode] = []
+    i = j = 0
+    for mi, mj in _matching_pairs(ids_a, ids_b) + [(len(a), len(b))]:
+        if i < mi and j < mj:
+            codes.append(("replace", i, mi, j, mj))
+        elif i < mi:
+            codes.append(("delete", i, mi, j, j))
+        elif j < mj:
+            codes.append(("insert", i, i, j, mj))
+        if mi < len(a) and codes and codes[-1][0] == "equal" and codes[-1][2] == mi:
+            tag, i1, _, j1, _ = codes[-1]
+            codes[-1] = (tag, i1, mi + 1, j1, mj + 1)
+        elif mi < len(a):
+            codes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return codes
+
+
+def grouped_opcodes(codes: list[Opcode], context: int = 3) -> Iterator[list[Opcode]]:
+    # Same grouping as difflib.SequenceMatcher.get_grouped_opcodes.
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    codes = list(codes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    span = context + context
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > span:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "", tofile: str = "", context: int = 3) -> str:
+    # Output matches difflib.unified_diff for the same opcodes.
+    out: list[str] = []
+    for group in grouped_opcodes(opcodes(a, b), context):
+        if not out:
+            out.append(f"--- {fromfile}\n")
+            out.append(f"+++ {tofile}\n")
+        first, last = group[0], group[-1]
+        out.append(f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend("-" + line for line in a[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend("+" + line for line in b[j1:j2])
+    return "".join(out)
+
+
+def line_hunks(a: Sequence[str], b: Sequence[str], context: int = 3) -> list[dict]:
+    hunks: list[dict] = []
+    for group in grouped_opcodes(opcodes(a, b), context):
+        first, last = group[0], group[-1]
+        lines: list[dict] = []
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend({"op": "equal", "text": line} for line in a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                lines.extend({"op": "delete", "text": line} for line in a[i1:i2])
+            if tag in ("replace", "insert"):
+                lines.extend({"op": "insert", "text": line} for line in b[j1:j2])
+        hunks.append(
+            {
+                "a_start": first[1] + 1,
+                "a_count": last[2] - first[1],
+                "b_start": first[3] + 1,
+                "b_count": last[4] - first[3],
+                "lines": lines,
+            }
+        )
+    return hunks
+
+
+def word_segments(a_text: str, b_text: str) -> list[dict]:
+    a, b = split_words(a_text), split_words(b_text)
+    segments: list[dict] = []
+
+    def add(op: str, text: str) -> None:
+        if segments and segments[-1]["op"] == op:
+            segments[-1]["text"] += text
+        else:
+            segments.append({"op": op, "text": text})
+
+    for tag, i1, i2, j1, j2 in opcodes(a, b):
+        if tag == "equal":
+            add("equal", "".join(a[i1:i2]))
+            continue
+        if tag in ("replace", "delete"):
+            add("delete", "".join(a[i1:i2]))
+        if tag in ("replace", "insert"):
+            add("insert", "".join(b[j1:j2]))
+    return segments
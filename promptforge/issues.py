@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
+import sys
+from typing import Iterable, Iterator, overload
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Issue:
     rule_id: str
     severity: str
@@ -13,6 +16,17 @@ class Issue:
     line: int | None = None
     column: int | None = None
 
+    def __post_init__(self) -> None:
+        # Bulk runs repeat the same few rule ids, severities and messages
+        # millions of times; interning keeps one copy of each.
+        object.__setattr__(self, "rule_id", sys.intern(self.rule_id))
+        object.__setattr__(self, "severity", sys.intern(self.severity))
+        object.__setattr__(self, "message", sys.intern(self.message))
+
+    def __reduce__(self) -> tuple:
+        # Rebuilt through the constructor, which unpickles far faster than slot state.
+        return Issue, (self.rule_id, self.severity, self.message, self.line, self.column)
+
     def format(self) -> str:
         location = ""
         if self.line is not None:
@@ -20,3 +34,102 @@ class Issue:
             if self.column is not None:
                 location += f":{self.column}"
         return f"{self.severity.upper()} [{self.rule_id}]{location}: {self.message}"
+
+
+class IssueColumns:
+    """Issues held as parallel arrays of rule index, message index, line and column.
+
+    Rules (rule id and severity) and messages are stored once in lookup tables,
+    so a result costs a few machine integers per issue and pickles cheaply when
+    sent back from a worker process. Missing lines and columns are stored as 0,
+    since both are 1-based. Iterating or indexing yields ``Issue`` objects.
+    """
+
+    __slots__ = ("rules", "messages", "rule_index", "message_index", "lines", "columns", "_rule_slots", "_message_slots")
+
+    def __init__(self) -> None:
+        self.rules: list[tuple[str, str]] = []
+        self.messages: list[str] = []
+        self.rule_index = array("I")
+        self.message_index = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+        self._rule_slots: dict[tuple[str, str], int] = {}
+        self._message_slots: dict[str, int] = {}
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[Issue]) -> IssueColumns:
+        columns = cls()
+        columns.extend(issues)
+        return columns
+
+    def append(self, issue: Issue) -> None:
+        rule = (issue.rule_id, issue.severity)
+        slot = self._rule_slots.get(rule)
+        if slot is None:
+            slot = self._rule_slots[rule] = len(self.rules)
+            self.rules.append(rule)
+        self.rule_index.append(slot)
+        slot = self._message_slots.get(issue.message)
+        if slot is None:
+            slot = self._message_slots[issue.message] = len(self.messages)
+            self.messages.append(issue.message)
+        self.message_index.append(slot)
+        self.lines.append(issue.line or 0)
+        self.columns.append(issue.column or 0)
+
+    def extend(self, issues: Iterable[Issue]) -> None:
+        for issue in issues:
+            self.append(issue)
+
+    def rule_counts(self) -> dict[str, int]:
+        """Issue count per rule id, computed from the index column alone."""
+        counts: dict[str, int] = {}
+        for slot, (rule_id, _) in enumerate(self.rules):
+            counts[rule_id] = counts.get(rule_id, 0) + self.rule_index.count(slot)
+        return counts
+
+    def _issue(self, position: int) -> Issue:
+        rule_id, severity = self.rules[self.rule_index[position]]
+        return Issue(
+            rule_id,
+            severity,
+            self.messages[self.message_index[position]],
+            self.lines[position] or None,
+            self.columns[position] or None,
+        )
+
+    @overload
+    def __getitem__(self, position: int) -> Issue: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[Issue]: ...
+
+    def __getitem__(self, position: int | slice) -> Issue | list[Issue]:
+        if isinstance(position, slice):
+            return [self._issue(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("IssueColumns index out of range")
+        return self._issue(position)
+
+    def __iter__(self) -> Iterator[Issue]:
+        for position in range(len(self)):
+            yield self._issue(position)
+
+    def __len__(self) -> int:
+        return len(self.rule_index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, IssueColumns):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __getstate__(self) -> tuple:
+        return self.rules, self.messages, self.rule_index, self.message_index, self.lines, self.columns
+
+    def __setstate__(self, state: tuple) -> None:
+        self.rules, self.messages, self.rule_index, self.message_index, self.lines, self.columns = state
+        self._rule_slots = {rule: slot for slot, rule in enumerate(self.rules)}
+        self._message_slots = {message: slot for slot, message in enumerate(self.messages)}
@@ -0,0 +1,136 @@
+"""Streaming lint of JSONL prompt corpora for ``promptforge lint-jsonl``."""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import json
+import time
+from typing import IO, Iterable, Iterator
+
+from promptforge.lint import Linter
+from promptforge.serialize import encode_lint_record
+
+# Records are shipped to workers in chunks to amortize IPC; a chunk closes at
+# whichever limit it reaches first.
+CHUNK_RECORDS = 256
+CHUNK_BYTES = 1 << 20
+
+Chunk = list[tuple[int, bytes]]
+# Rule ids to select and to ignore, as given to Linter.
+RuleFilter = tuple[tuple[str, ...] | None, tuple[str, ...] | None]
+
+_linters: dict[RuleFilter, Linter] = {}
+
+
+def _get_linter(rule_filter: RuleFilter = (None, None)) -> Linter:
+    linter = _linters.get(rule_filter)
+    if linter is None:
+        select, ignore = rule_filter
+        linter = _linters[rule_filter] = Linter(select=select, ignore=ignore)
+    return linter
+
+
+@dataclass
+class CorpusStats:
+    records: int = 0
+    errors: int = 0
+    issues: Counter = field(default_factory=Counter)
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def format(self) -> str:
+        rate = self.records / self.elapsed if self.elapsed else 0.0
+        summary = (
+            f"Linted {self.records} records in {self.elapsed:.2f}s ({rate:.0f} records/s): "
+            f"{sum(self.issues.values())} issues"
+        )
+        if self.issues:
+            summary += " (" + ", ".join(f"{rule_id}: {count}" for rule_id, count in sorted(self.issues.items())) + ")"
+        if self.errors:
+            summary += f", {self.errors} invalid records"
+        return summary + "."
+
+
+def _chunks(lines: Iterable[bytes]) -> Iterator[Chunk]:
+    chunk: Chunk = []
+    size = 0
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        chunk.append((number, line))
+        size += len(line)
+        if len(chunk) >= CHUNK_RECORDS or size >= CHUNK_BYTES:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def lint_chunk(
+    chunk: Chunk, text_field: str, id_field: str, rule_filter: RuleFilter = (None, None)
+) -> list[tuple[str, tuple[str, ...] | None]]:
+    """Lint one chunk; each result is the output line plus rule ids, or None for an invalid record."""
+    linter = _get_linter(rule_filter)
+    results: list[tuple[str, tuple[str, ...] | None]] = []
+    for number, line in chunk:
+        try:
+            record = json.loads(line)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            results.append((json.dumps({"line": number, "error": "Invalid JSON"}), None))
+            continue
+        if not isinstance(record, dict):
+            results.append((json.dumps({"line": number, "error": "Record must be an object"}), None))
+            continue
+        record_id = record.get(id_field, number)
+        text = record.get(text_field)
+        if not isinstance(text, str):
+            error = f"Record field {text_field!r} must be a string"
+            results.append((json.dumps({"id": record_id, "line": number, "error": error}), None))
+            continue
+        issues = linter.lint(text)
+        results.append((encode_lint_record(record_id, issues), tuple(issue.rule_id for issue in issues)))
+    return results
+
+
+def lint_corpus(
+    lines: Iterable[bytes],
+    out: IO[str],
+    jobs: int = 1,
+    text_field: str = "text",
+    id_field: str = "id",
+    rule_filter: RuleFilter = (None, None),
+) -> CorpusStats:
+    """Lint JSONL ``lines`` and write one result line per record to ``out``, in input order.
+
+    At most ``jobs * 2`` chunks are queued or running at a time, so memory stays
+    bounded by the chunk limits however long the corpus is.
+    """
+    stats = CorpusStats()
+
+    def emit(results: list[tuple[str, tuple[str, ...] | None]]) -> None:
+        for output, rule_ids in results:
+            out.write(output + "\n")
+            stats.records += 1
+            if rule_ids is None:
+                stats.errors += 1
+            else:
+                stats.issues.update(rule_ids)
+
+    if jobs <= 1:
+        for chunk in _chunks(lines):
+            emit(lint_chunk(chunk, text_field, id_field, rule_filter))
+    else:
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending: deque[Future] = deque()
+            for chunk in _chunks(lines):
+                if len(pending) >= jobs * 2:
+                    emit(pending.popleft().result())
+                pending.append(pool.submit(lint_chunk, chunk, text_field, id_field, rule_filter))
+            while pending:
+                emit(pending.popleft().result())
+    out.flush()
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
@@ -0,0 +1,39 @@
+"""Line-offset index for resolving match offsets to positions."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+
+
+class LineIndex:
+    """Maps character offsets in one document to 1-based (line, column) pairs.
+
+    Line starts are collected lazily on the first lookup, so documents without
+    locatable findings never pay for the index. ``line`` and ``column`` give
+    the position of offset 0 when the text is a slice of a larger stream.
+    """
+
+    def __init__(self, content: str, line: int = 1, column: int = 1) -> None:
+        self._content = content
+        self._origin = (line, column)
+        self._starts: list[int] | None = None
+
+    @property
+    def line_starts(self) -> list[int]:
+        if self._starts is None:
+            content = self._content
+            starts = [0]
+            index = content.find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = content.find("\n", index + 1)
+            self._starts = starts
+        return self._starts
+
+    def locate(self, offset: int) -> tuple[int, int]:
+        starts = self.line_starts
+        line = bisect_right(starts, offset)
+        origin_line, origin_column = self._origin
+        if line == 1:
+            return origin_line, origin_column + offset
+        return origin_line + line - 1, offset - starts[line - 1] + 1
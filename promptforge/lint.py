@@ -2,18 +2,192 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+from pathlib import Path
+import time
+from typing import Callable, Iterable, Iterator, Mapping
 
+from promptforge import metrics
 from promptforge.issues import Issue
-from promptforge.rules import Rule, RULES
+from promptforge.lines import LineIndex
+from promptforge.matcher import MarkerMatcher
+from promptforge.rules import Rule, RULES, rule_set_fingerprint
+from promptforge.window import Window
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_OVERLAP = 256
+
+
+def read_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    with path.open(encoding="utf-8") as handle:
+        while chunk := handle.read(chunk_size):
+            yield chunk
+
+
+def select_rules(
+    rules: Iterable[Rule], select: Iterable[str] | None = None, ignore: Iterable[str] | None = None
+) -> list[Rule]:
+    """Keep the rules whose ids are in ``select`` (all when None) and not in ``ignore``."""
+    rules = list(rules)
+    selected = None if select is None else {rule_id.strip().upper() for rule_id in select}
+    ignored = {rule_id.strip().upper() for rule_id in ignore or ()}
+    unknown = sorted(((selected or set()) | ignored) - {rule.rule_id for rule in rules})
+    if unknown:
+        raise ValueError(f"Unknown rule id(s): {', '.join(unknown)}")
+    return [
+        rule
+        for rule in rules
+        if (selected is None or rule.rule_id in selected) and rule.rule_id not in ignored
+    ]
 
 
 class Linter:
-    def __init__(self, rules: Iterable[Rule] | None = None) -> None:
-        self._rules = list(rules) if rules is not None else list(RULES)
+    """Runs a rule set over documents.
+
+    ``select`` and ``ignore`` narrow the rule set by rule id, which also shrinks
+    the marker vocabulary every document is scanned for. With ``max_issues``,
+    ``lint`` returns the first ``max_issues`` issues a full lint would and stops
+    once no unevaluated rule can change them.
+
+    Rules are evaluated cheapest first: document-level rules, which only turn
+    collected facts into a verdict, then rules that report every match, then
+    rules that rescan the whole document with ``check()``. The order is fixed
+    per rule set, and issues are still returned in rule order, so it only
+    changes how much work a truncated lint does, never its result. Pass
+    ``scheduled=False`` to evaluate rules in rule order.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Rule] | None = None,
+        select: Iterable[str] | None = None,
+        ignore: Iterable[str] | None = None,
+        max_issues: int | None = None,
+        scheduled: bool = True,
+    ) -> None:
+        if max_issues is not None and max_issues < 1:
+            raise ValueError("max_issues must be at least 1")
+        self._rules = select_rules(RULES if rules is None else rules, select, ignore)
+        self.max_issues = max_issues
+        self.fingerprint = rule_set_fingerprint(self._rules)
+        # One shared vocabulary so each document is scanned once for every rule.
+        self._matcher = MarkerMatcher(marker for rule in self._rules for marker in rule.markers())
+        # Rules that only override check() cannot take part in windowed evaluation.
+        self._whole_only = [type(rule).check is not Rule.check for rule in self._rules]
+        longest = max((rule.reach() for rule in self._rules), default=0)
+        self._overlap = max(DEFAULT_OVERLAP, longest + 1)
+        self._schedule = list(range(len(self._rules)))
+        if scheduled:
+            document_level = [type(rule).findings is Rule.findings for rule in self._rules]
+            self._schedule.sort(key=lambda index: (self._whole_only[index], not document_level[index], index))
+
+    @property
+    def rules(self) -> tuple[Rule, ...]:
+        return tuple(self._rules)
+
+    @property
+    def matcher(self) -> MarkerMatcher:
+        return self._matcher
+
+    @property
+    def overlap(self) -> int:
+        """Characters of following context a window needs for its findings to be exact."""
+        return self._overlap
+
+    def window_findings(self, window: Window, facts: dict[str, int]) -> list[tuple[int, Issue]]:
+        """Collect ``window``'s facts and return its findings tagged with the rule's index."""
+        found: list[tuple[int, Issue]] = []
+        for index, (rule, whole_only) in enumerate(zip(self._rules, self._whole_only)):
+            if whole_only:
+                continue
+            rule.collect(window, facts)
+            found.extend((index, issue) for issue in rule.findings(window))
+        return found
+
+    def document_issues(
+        self, content: Callable[[], str], facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]
+    ) -> list[tuple[int, Issue]]:
+        """Verdicts from fully collected facts, plus check() for rules that only support whole documents."""
+        found: list[tuple[int, Issue]] = []
+        for index, (rule, whole_only) in enumerate(zip(self._rules, self._whole_only)):
+            issues = rule.check(content()) if whole_only else rule.verdict(facts, locate)
+            found.extend((index, issue) for issue in issues)
+        return found
 
     def lint(self, content: str) -> list[Issue]:
-        issues: list[Issue] = []
-        for rule in self._rules:
-            issues.extend(rule.check(content))
+        profiled = metrics.enabled()
+        started = time.perf_counter() if profiled else 0.0
+        window = Window.whole(content, self._matcher)
+        facts: dict[str, int] = {}
+        window.add_marker_facts(facts)
+        found: list[list[Issue] | None] = [None] * len(self._rules)
+        # Rules, in rule order, whose issues are all known, and how many issues they reported.
+        settled = reported = 0
+        for index in self._schedule:
+            rule = self._rules[index]
+            rule_started = time.perf_counter() if profiled else 0.0
+            if self._whole_only[index]:
+                issues = rule.check(content)
+            else:
+                rule.collect(window, facts)
+                issues = rule.findings(window) + rule.verdict(facts, window.lines.locate)
+            if profiled:
+                metrics.RULE_SECONDS.observe(time.perf_counter() - rule_started, rule=rule.rule_id)
+                metrics.RULE_ISSUES.inc(len(issues), rule=rule.rule_id)
+            found[index] = issues
+            while settled < len(found) and (settled_issues := found[settled]) is not None:
+                reported += len(settled_issues)
+                settled += 1
+            if self.max_issues is not None and reported >= self.max_issues:
+                # The rules not evaluated yet all come after the first max_issues issues.
+                break
+        if profiled:
+            metrics.LINT_SECONDS.observe(time.perf_counter() - started)
+            metrics.LINT_INPUT_CHARS.observe(len(content))
+        issues = [issue for rule_issues in found[:settled] for issue in rule_issues or ()]
+        if self.max_issues is not None:
+            del issues[self.max_issues :]
         return issues
+
+    def lint_stream(self, chunks: Iterable[str]) -> Iterator[Issue]:
+        if any(self._whole_only):
+            raise TypeError("Streaming lint needs rules that implement collect/findings/verdict.")
+        facts: dict[str, int] = {}
+        located: dict[int, tuple[int, int]] = {}
+        text = ""
+        start = base = 0
+        line = column = 1
+        for chunk in chunks:
+            text += chunk
+            # Hold back the overlap so markers crossing the chunk edge are seen whole next time.
+            end = len(text) - self._overlap
+            if end <= start:
+                continue
+            window = Window(text, self._matcher.scan(text), LineIndex(text, line, column), start, end, base)
+            window.add_marker_facts(facts)
+            for rule in self._rules:
+                rule.collect(window, facts)
+                yield from rule.findings(window)
+            # Later windows cannot resolve these offsets, so pin their positions now.
+            for offset in facts.values():
+                if offset >= base and offset not in located:
+                    located[offset] = window.lines.locate(offset - base)
+            # Keep one character before the next region for word-boundary checks.
+            keep = end - 1
+            line, column = window.lines.locate(keep)
+            text = text[keep:]
+            base += keep
+            start = 1
+
+        lines = LineIndex(text, line, column)
+        window = Window(text, self._matcher.scan(text), lines, start, len(text), base)
+        window.add_marker_facts(facts)
+
+        def locate(offset: int) -> tuple[int, int]:
+            if offset in located:
+                return located[offset]
+            return lines.locate(offset - base)
+
+        for rule in self._rules:
+            rule.collect(window, facts)
+            yield from rule.findings(window)
+            yield from rule.verdict(facts, locate)
@@ -0,0 +1,95 @@
+"""Shared multi-marker matcher for PromptForge rules."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import re
+from typing import Iterable
+
+
+def _trie_pattern(node: dict) -> str:
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if terminal:
+        # Greedy optional keeps the longest marker at each position.
+        return f"(?:{body})?"
+    return body
+
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class MarkerHits:
+    """Start offsets of every marker occurrence found in one document."""
+
+    def __init__(self, positions: dict[str, list[int]]) -> None:
+        self._positions = positions
+
+    def __contains__(self, marker: str) -> bool:
+        return marker.lower() in self._positions
+
+    def positions(self, marker: str) -> list[int]:
+        return self._positions.get(marker.lower(), [])
+
+    def items(self) -> Iterable[tuple[str, list[int]]]:
+        return self._positions.items()
+
+    def any(self, markers: Iterable[str]) -> bool:
+        return any(marker.lower() in self._positions for marker in markers)
+
+
+class MarkerMatcher:
+    """Case-insensitive substring matcher over a fixed marker vocabulary.
+
+    All markers are compiled into one trie-shaped regular expression inside a
+    lookahead, so a single walk over the text reports every (possibly
+    overlapping) occurrence of every marker.
+    """
+
+    def __init__(self, markers: Iterable[str]) -> None:
+        self.markers = tuple(sorted({marker.lower() for marker in markers if marker}))
+        trie: dict = {}
+        for marker in self.markers:
+            node = trie
+            for char in marker:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        source = f"(?=({_trie_pattern(trie)}))"
+        self._pattern = re.compile(source) if self.markers else None
+        self._folding_pattern = re.compile(source, re.IGNORECASE) if self.markers else None
+        # Markers sharing a start offset are exactly the marker prefixes of the longest one.
+        self._prefixes = {
+            marker: tuple(other for other in self.markers if marker.startswith(other))
+            for marker in self.markers
+        }
+
+    def scan(self, content: str) -> MarkerHits:
+        positions: dict[str, list[int]] = {}
+        if self._pattern is None:
+            return MarkerHits(positions)
+        # Matching lowered text case-sensitively is much faster than IGNORECASE, but
+        # offsets are only shared with the original when lowering keeps the length.
+        lowered = content.lower()
+        if len(lowered) == len(content):
+            matches = self._pattern.finditer(lowered)
+        else:
+            matches = self._folding_pattern.finditer(content)
+        prefixes = self._prefixes
+        for match in matches:
+            found = match.group(1).lower()
+            matched = prefixes.get(found)
+            if matched is None:
+                # Unicode case folds (e.g. the long s) match the regex but do not lower to a marker.
+                matched = tuple(marker for marker in self.markers if found.startswith(marker))
+            for marker in matched:
+                positions.setdefault(marker, []).append(match.start())
+        return MarkerHits(positions)
+
+
+@lru_cache(maxsize=64)
+def compile_markers(markers: tuple[str, ...]) -> MarkerMatcher:
+    return MarkerMatcher(markers)
@@ -0,0 +1,186 @@
+"""Optional in-process metrics with Prometheus text exposition.
+
+Collection is off unless ``enable()`` is called or ``PROMPTFORGE_METRICS=1``
+is set. Every hook checks the flag first, so disabled metrics cost one global
+lookup per instrumented call.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from functools import wraps
+import math
+import os
+import threading
+import time
+from typing import Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+
+
+_enabled = os.getenv("PROMPTFORGE_METRICS", "") not in ("", "0")
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def _format_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count, sum].
+        self._series: dict[Labels, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self) -> dict[Labels, tuple[int, float]]:
+        """(count, sum) for every label set."""
+        with self._lock:
+            return {labels: (int(sum(series[:-1])), series[-1]) for labels, series in self._series.items()}
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels, (('le', _format_value(bound)),))} {int(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(labels)} {int(cumulative)}"
+
+
+RULE_SECONDS = Histogram("promptforge_rule_seconds", "Time spent evaluating one rule on one document.")
+RULE_ISSUES = Counter("promptforge_rule_issues_total", "Issues reported per rule.")
+LINT_SECONDS = Histogram("promptforge_lint_seconds", "Time spent linting one document with every rule.")
+LINT_INPUT_CHARS = Histogram("promptforge_lint_input_chars", "Size of linted documents in characters.", SIZE_BUCKETS)
+HTTP_SECONDS = Histogram("promptforge_http_request_seconds", "HTTP request latency by route.")
+HTTP_REQUESTS = Counter("promptforge_http_requests_total", "HTTP requests by route, method and status.")
+HTTP_REQUEST_BYTES = Histogram("promptforge_http_request_bytes", "HTTP request body sizes by route.", SIZE_BUCKETS)
+STORAGE_SECONDS = Histogram("promptforge_storage_seconds", "Version store operation latency.")
+
+_METRICS: list[Counter | Histogram] = [
+    RULE_SECONDS,
+    RULE_ISSUES,
+    LINT_SECONDS,
+    LINT_INPUT_CHARS,
+    HTTP_SECONDS,
+    HTTP_REQUESTS,
+    HTTP_REQUEST_BYTES,
+    STORAGE_SECONDS,
+]
+# Called at render time for values owned elsewhere, such as cache counters.
+_collectors: list[Callable[[], Iterator[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterator[str]]) -> None:
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable[[F], F]:
+    """Decorator recording the call's duration in ``histogram`` while metrics are enabled."""
+
+    def decorate(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def format_profile() -> str:
+    """Human-readable totals of every latency histogram, for ``--profile`` output."""
+    rows: list[tuple[str, int, float]] = []
+    for metric in (LINT_SECONDS, RULE_SECONDS, STORAGE_SECONDS, HTTP_SECONDS):
+        for labels, (count, total) in sorted(metric.snapshot().items()):
+            name = metric.name.removeprefix("promptforge_").removesuffix("_seconds")
+            label = ",".join(value for _, value in labels)
+            rows.append((f"{name}[{label}]" if label else name, count, total))
+    if not rows:
+        return "No timings recorded."
+    width = max(len(name) for name, _, _ in rows)
+    lines = [f"{'operation':<{width}}  {'calls':>8}  {'total ms':>10}  {'mean ms':>9}"]
+    for name, count, total in rows:
+        lines.append(f"{name:<{width}}  {count:>8}  {total * 1e3:>10.2f}  {total * 1e3 / max(count, 1):>9.3f}")
+    return "\n".join(lines)
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import lru_cache
+import hashlib
 import re
-from typing import Iterable
+from typing import Callable, Iterable, Mapping
 
+from promptforge import __version__
 from promptforge.issues import Issue
+from promptforge.matcher import compile_markers, is_word_char
+from promptforge.window import Window
 
 
 @dataclass(frozen=True)
@@ -15,12 +20,61 @@ class Rule:
     name: str
     description: str
 
+    def markers(self) -> tuple[str, ...]:
+        return ()
+
+    def reach(self) -> int:
+        """Longest stretch of text, from where it starts, that one finding or fact depends on."""
+        return max((len(marker) for marker in self.markers()), default=0)
+
+    def collect(self, window: Window, facts: dict[str, int]) -> None:
+        return None
+
+    def findings(self, window: Window) -> list[Issue]:
+        return []
+
+    def verdict(self, facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]) -> list[Issue]:
+        return []
+
     def check(self, content: str) -> list[Issue]:
-        raise NotImplementedError
+        window = Window.whole(content, compile_markers(self.markers()))
+        facts: dict[str, int] = {}
+        window.add_marker_facts(facts)
+        self.collect(window, facts)
+        return self.findings(window) + self.verdict(facts, window.lines.locate)
+
+
+def _is_whole_word(content: str, start: int, end: int) -> bool:
+    if start > 0 and is_word_char(content[start - 1]):
+        return False
+    return end >= len(content) or not is_word_char(content[end])
+
+
+def _has_any(facts: Mapping[str, int], markers: Iterable[str]) -> bool:
+    return any(marker.lower() in facts for marker in markers)
 
 
-def _line_number(content: str, index: int) -> int:
-    return content.count("\n", 0, index) + 1
+def _first_offset(facts: Mapping[str, int], markers: Iterable[str]) -> int | None:
+    return min((facts[marker.lower()] for marker in markers if marker.lower() in facts), default=None)
+
+
+# Whitespace allowed on either side of the article in "for the user". Bounded so
+# that the phrase fits in the context a stream window looks ahead.
+_ROLE_GAP = 32
+
+
+@lru_cache(maxsize=32)
+def _role_pattern(role_markers: tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile(
+        rf"\bfor\s{{1,{_ROLE_GAP}}}(?:a|an|the)?\s{{0,{_ROLE_GAP}}}(?:{'|'.join(role_markers)})\b",
+        re.IGNORECASE,
+    )
+
+
+# Longer digit runs are not length constraints; the bound keeps a number within
+# the context a stream window looks ahead, like _ROLE_GAP.
+_MAX_NUMBER_DIGITS = 32
+_NUMERIC_PATTERN = re.compile(rf"\b\d{{1,{_MAX_NUMBER_DIGITS}}}\b")
 
 
 @dataclass(frozen=True)
@@ -39,9 +93,11 @@ class MissingOutputFormatRule(Rule):
         "paragraphs",
     )
 
-    def check(self, content: str) -> list[Issue]:
-        lowered = content.lower()
-        if any(marker in lowered for marker in self.format_markers):
+    def markers(self) -> tuple[str, ...]:
+        return self.format_markers
+
+    def verdict(self, facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]) -> list[Issue]:
+        if _has_any(facts, self.format_markers):
             return []
         return [
             Issue(
@@ -57,17 +113,25 @@ class MissingOutputFormatRule(Rule):
 class VagueVerbsRule(Rule):
     vague_verbs: tuple[str, ...] = ("improve", "optimize", "enhance", "better")
 
-    def check(self, content: str) -> list[Issue]:
+    def markers(self) -> tuple[str, ...]:
+        return self.vague_verbs
+
+    def findings(self, window: Window) -> list[Issue]:
+        content = window.content
         issues: list[Issue] = []
         for verb in self.vague_verbs:
-            pattern = re.compile(rf"\b{re.escape(verb)}\b", re.IGNORECASE)
-            for match in pattern.finditer(content):
+            for start in window.positions(verb):
+                end = start + len(verb)
+                if not _is_whole_word(content, start, end):
+                    continue
+                line, column = window.lines.locate(start)
                 issues.append(
                     Issue(
                         rule_id=self.rule_id,
                         severity="error",
-                        message=f"Vague verb '{match.group(0)}' found; be specific.",
-                        line=_line_number(content, match.start()),
+                        message=f"Vague verb '{content[start:end]}' found; be specific.",
+                        line=line,
+                        column=column,
                     )
                 )
         return issues
@@ -89,20 +153,25 @@ class ContradictoryConstraintsRule(Rule):
         "explain in detail",
     )
 
-    def check(self, content: str) -> list[Issue]:
-        lowered = content.lower()
-        has_concise = any(marker in lowered for marker in self.concise_markers)
-        has_detailed = any(marker in lowered for marker in self.detailed_markers)
-        if has_concise and has_detailed:
-            return [
-                Issue(
-                    rule_id=self.rule_id,
-                    severity="error",
-                    message="Contradictory constraints: concise and detailed requirements conflict.",
-                    line=1,
-                )
-            ]
-        return []
+    def markers(self) -> tuple[str, ...]:
+        return self.concise_markers + self.detailed_markers
+
+    def verdict(self, facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]) -> list[Issue]:
+        concise_at = _first_offset(facts, self.concise_markers)
+        detailed_at = _first_offset(facts, self.detailed_markers)
+        if concise_at is None or detailed_at is None:
+            return []
+        # Point at the marker that introduces the conflict.
+        line, column = locate(max(concise_at, detailed_at))
+        return [
+            Issue(
+                rule_id=self.rule_id,
+                severity="error",
+                message="Contradictory constraints: concise and detailed requirements conflict.",
+                line=line,
+                column=column,
+            )
+        ]
 
 
 @dataclass(frozen=True)
@@ -126,15 +195,26 @@ class MissingAudienceRule(Rule):
         "reader",
     )
 
-    def check(self, content: str) -> list[Issue]:
-        lowered = content.lower()
-        if any(marker in lowered for marker in self.audience_markers):
-            return []
-        role_pattern = re.compile(
-            rf"\bfor\s+(?:a|an|the)?\s*(?:{'|'.join(self.role_markers)})\b",
-            re.IGNORECASE,
-        )
-        if role_pattern.search(content):
+    def markers(self) -> tuple[str, ...]:
+        return self.audience_markers + ("for",)
+
+    def reach(self) -> int:
+        longest_role = max((len(role) for role in self.role_markers), default=0)
+        return max(super().reach(), len("for") + len("the") + 2 * _ROLE_GAP + longest_role)
+
+    def collect(self, window: Window, facts: dict[str, int]) -> None:
+        role_fact = f"{self.rule_id}:role"
+        if role_fact in facts or _has_any(facts, self.audience_markers):
+            return
+        # The role phrase can only start where "for" occurs, so anchor there instead of searching.
+        role_pattern = _role_pattern(self.role_markers)
+        for start in window.positions("for"):
+            if role_pattern.match(window.content, start):
+                facts[role_fact] = window.base + start
+                return
+
+    def verdict(self, facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]) -> list[Issue]:
+        if f"{self.rule_id}:role" in facts or _has_any(facts, self.audience_markers):
             return []
         return [
             Issue(
@@ -172,12 +252,22 @@ class MissingLengthConstraintRule(Rule):
         "succinct",
     )
 
-    def check(self, content: str) -> list[Issue]:
-        lowered = content.lower()
-        numeric_pattern = re.compile(r"\b\d+\b")
-        has_numeric = bool(numeric_pattern.search(content))
-        has_marker = any(marker in lowered for marker in self.length_markers)
-        if has_numeric or has_marker:
+    def markers(self) -> tuple[str, ...]:
+        return self.length_markers
+
+    def reach(self) -> int:
+        return max(super().reach(), _MAX_NUMBER_DIGITS)
+
+    def collect(self, window: Window, facts: dict[str, int]) -> None:
+        number_fact = f"{self.rule_id}:number"
+        if number_fact in facts or _has_any(facts, self.length_markers):
+            return
+        match = _NUMERIC_PATTERN.search(window.content, window.start)
+        if match and match.start() < window.end:
+            facts[number_fact] = window.base + match.start()
+
+    def verdict(self, facts: Mapping[str, int], locate: Callable[[int], tuple[int, int]]) -> list[Issue]:
+        if f"{self.rule_id}:number" in facts or _has_any(facts, self.length_markers):
             return []
         return [
             Issue(
@@ -216,3 +306,12 @@ RULES: Iterable[Rule] = (
         "Prompt must include length or scope constraints.",
     ),
 )
+
+
+def rule_set_fingerprint(rules: Iterable[Rule]) -> str:
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    for rule in rules:
+        rule_type = type(rule)
+        values = tuple((field.name, getattr(rule, field.name)) for field in fields(rule))
+        digest.update(f"{rule_type.__module__}.{rule_type.__qualname__}{values!r}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
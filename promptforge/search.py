@@ -0,0 +1,46 @@
+"""Query parsing for full-text search over saved versions.
+
+A query is whitespace-separated terms, all of which must match:
+
+- ``word`` matches versions whose label or text contains the word;
+- ``"some phrase"`` matches the words in that order;
+- ``label:word`` or ``label:"some phrase"`` only looks at labels;
+- ``rule:PF003`` keeps versions whose current lint snapshot has a PF003 issue.
+
+Text terms compile to an SQLite FTS5 expression in which every term is a
+quoted string, so user input can never be read as FTS5 operators.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+_TERM_PATTERN = re.compile(r'(?:(label|rule):)?(?:"([^"]*)"|(\S+))')
+_WORD_PATTERN = re.compile(r"\w")
+
+
+class SearchQuery(NamedTuple):
+    # FTS5 MATCH expression for the text terms, or None for a rule-only query.
+    match: str | None
+    rules: tuple[str, ...]
+
+
+def _quoted(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def parse_query(query: str) -> SearchQuery:
+    """Compile a search query; raises ``ValueError`` when it has nothing to search for."""
+    terms: list[str] = []
+    rules: list[str] = []
+    for field, phrase, word in _TERM_PATTERN.findall(query):
+        value = phrase or word
+        if field == "rule":
+            rules.extend(rule_id.strip().upper() for rule_id in value.split(",") if rule_id.strip())
+        elif _WORD_PATTERN.search(value):
+            # Terms without word characters tokenize to nothing and would match nothing.
+            terms.append(f"label : {_quoted(value)}" if field == "label" else _quoted(value))
+    if not terms and not rules:
+        raise ValueError("Empty search query")
+    return SearchQuery(" AND ".join(terms) or None, tuple(dict.fromkeys(rules)))
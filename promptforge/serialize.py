@@ -0,0 +1,71 @@
+"""Fast JSON encoding of issue lists.
+
+The output is byte-for-byte what ``json.dumps`` gives for the issues as dicts,
+without building those dicts. The leading ``rule_id``/``severity``/``message``
+part of each object is encoded once per distinct triple and reused, since bulk
+runs repeat a handful of messages many times over.
+"""
+
+from __future__ import annotations
+
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Iterable
+
+from promptforge.issues import Issue
+
+# Encoded heads are dropped wholesale past this many, which only costs re-encoding.
+_MAX_HEADS = 4096
+_heads: dict[tuple[str, str, str], str] = {}
+
+
+def issue_dict(issue: Issue) -> dict:
+    """The plain-dict form of an issue, as ``dataclasses.asdict`` would give without the deep copy."""
+    return {
+        "rule_id": issue.rule_id,
+        "severity": issue.severity,
+        "message": issue.message,
+        "line": issue.line,
+        "column": issue.column,
+    }
+
+
+def _head(issue: Issue) -> str:
+    key = (issue.rule_id, issue.severity, issue.message)
+    head = _heads.get(key)
+    if head is None:
+        if len(_heads) >= _MAX_HEADS:
+            _heads.clear()
+        head = _heads[key] = (
+            f'{{"rule_id": {encode_basestring_ascii(issue.rule_id)}, '
+            f'"severity": {encode_basestring_ascii(issue.severity)}, '
+            f'"message": {encode_basestring_ascii(issue.message)}, "line": '
+        )
+    return head
+
+
+def encode_issues(issues: Iterable[Issue]) -> str:
+    """A JSON array of issues."""
+    parts = []
+    for issue in issues:
+        line, column = issue.line, issue.column
+        parts.append(
+            f'{_head(issue)}{"null" if line is None else int(line)}, '
+            f'"column": {"null" if column is None else int(column)}}}'
+        )
+    return "[" + ", ".join(parts) + "]"
+
+
+def decode_issues(raw: str | bytes) -> tuple[Issue, ...]:
+    """Issues back from a JSON array written by ``encode_issues``."""
+    return tuple(Issue(**item) for item in json.loads(raw))
+
+
+def encode_lint_payload(issues: Iterable[Issue]) -> bytes:
+    """The ``{"issues": [...]}`` body returned by the lint endpoints."""
+    return ('{"issues": ' + encode_issues(issues) + "}").encode("ascii")
+
+
+def encode_lint_record(record_id: object, issues: Iterable[Issue]) -> str:
+    """One ``{"id": ..., "issues": [...]}`` NDJSON line, without the trailing newline."""
+    return '{"id": ' + json.dumps(record_id) + ', "issues": ' + encode_issues(issues) + "}"
@@ -0,0 +1,232 @@
+"""Incremental lint sessions for live editing."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import replace
+import secrets
+import threading
+import time
+
+from promptforge.issues import Issue
+from promptforge.lines import LineIndex
+from promptforge.lint import Linter
+from promptforge.matcher import MarkerHits
+from promptforge.window import Window
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60.0
+DEFAULT_MAX_SESSIONS = 256
+# Document-level facts are stored as (line index << _LINE_SHIFT) | column offset,
+# which orders like document offsets and survives line insertions above them.
+_LINE_SHIFT = 32
+_COLUMN_MASK = (1 << _LINE_SHIFT) - 1
+
+
+class _Line:
+    __slots__ = ("facts", "issues")
+
+    def __init__(self, facts: dict[str, int], issues: list[tuple[int, Issue]]) -> None:
+        self.facts = facts
+        self.issues = issues
+
+
+def _locate(encoded: int) -> tuple[int, int]:
+    return (encoded >> _LINE_SHIFT) + 1, (encoded & _COLUMN_MASK) + 1
+
+
+class LintSession:
+    """A document kept server-side and re-linted one edited region at a time.
+
+    Each line is evaluated as a window holding the line plus ``Linter.overlap``
+    characters of following context, the same contract streaming lint uses. An
+    edit re-evaluates the lines it touches and the few preceding lines whose
+    context reaches into it. Document-level verdicts are rebuilt from per-line
+    facts, tracking the first line holding each fact.
+    """
+
+    def __init__(self, linter: Linter, text: str) -> None:
+        self.linter = linter
+        self.version = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self._texts: list[str] = []
+        self._lines: list[_Line] = []
+        self._counts: dict[str, int] = {}
+        self._first: dict[str, int] = {}
+        self._splice(0, 0, text.split("\n"))
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self._texts)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._texts)
+
+    def _line_hits(self, start: int, stop: int) -> list[MarkerHits]:
+        # One scan of the region, split per line, instead of one scan per line window.
+        texts = self._texts[start:stop]
+        if not texts:
+            return []
+        starts: list[int] = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        positions: list[dict[str, list[int]]] = [{} for _ in texts]
+        for marker, found in self.linter.matcher.scan("\n".join(texts)).items():
+            for position in found:
+                line = bisect_right(starts, position) - 1
+                # Shifted into the line window, which starts with the previous newline.
+                shift = starts[line] - (1 if start + line else 0)
+                positions[line].setdefault(marker, []).append(position - shift)
+        return [MarkerHits(line_positions) for line_positions in positions]
+
+    def _evaluate(self, index: int, hits: MarkerHits | None = None) -> _Line:
+        texts = self._texts
+        text = texts[index]
+        prefix = "\n" if index else ""
+        overlap = self.linter.overlap
+        pieces = [prefix, text]
+        gathered = 0
+        following = index + 1
+        while following < len(texts) and gathered < overlap:
+            piece = "\n" + texts[following]
+            pieces.append(piece[: overlap - gathered])
+            gathered += len(piece)
+            following += 1
+        content = "".join(pieces)
+        start = len(prefix)
+        # Offsets relative to the line start, so facts hold the 0-based column.
+        window = Window(
+            content,
+            self.linter.matcher.scan(content) if hits is None else hits,
+            LineIndex(content, 0 if prefix else 1, 1),
+            start,
+            start + len(text),
+            -start,
+        )
+        facts: dict[str, int] = {}
+        window.add_marker_facts(facts)
+        return _Line(facts, self.linter.window_findings(window, facts))
+
+    def _splice(self, start: int, stop: int, texts: list[str]) -> None:
+        counts = self._counts
+        for line in self._lines[start:stop]:
+            for key in line.facts:
+                counts[key] -= 1
+        self._texts[start:stop] = texts
+        added = len(texts)
+        shift = added - (stop - start)
+        stale: list[str] = []
+        for key, first in self._first.items():
+            if first >= stop:
+                self._first[key] = first + shift
+            elif first >= start:
+                stale.append(key)
+        for key in stale:
+            del self._first[key]
+
+        hits = self._line_hits(start, start + added) if added > 1 else [None] * added
+        lines = [self._evaluate(start + offset, line_hits) for offset, line_hits in enumerate(hits)]
+        self._lines[start:stop] = lines
+        for offset, line in enumerate(lines):
+            for key in line.facts:
+                counts[key] = counts.get(key, 0) + 1
+                first = self._first.get(key)
+                if first is None or first > start + offset:
+                    self._first[key] = start + offset
+        for key in stale:
+            if key in self._first:
+                continue
+            if not counts.get(key):
+                counts.pop(key, None)
+                continue
+            # The first occurrence was deleted; the next one is below the edit.
+            index = start + added
+            while key not in self._lines[index].facts:
+                index += 1
+            self._first[key] = index
+
+    def apply_edit(self, start: tuple[int, int], end: tuple[int, int], text: str) -> None:
+        """Replace the text between two 1-based (line, column) positions."""
+        (start_line, start_column), (end_line, end_column) = start, end
+        if not (1 <= start_line <= end_line <= len(self._texts)):
+            raise ValueError("Edit lines are out of range")
+        first_text, last_text = self._texts[start_line - 1], self._texts[end_line - 1]
+        if not (1 <= start_column <= len(first_text) + 1 and 1 <= end_column <= len(last_text) + 1):
+            raise ValueError("Edit columns are out of range")
+        if start_line == end_line and end_column < start_column:
+            raise ValueError("Edit end is before its start")
+        replacement = (first_text[: start_column - 1] + text + last_text[end_column - 1 :]).split("\n")
+
+        # Earlier lines whose following context overlaps the edit see different text too.
+        begin = start_line - 1
+        gap = 1
+        while begin > 0 and gap <= self.linter.overlap:
+            begin -= 1
+            gap += len(self._texts[begin]) + 1
+        self._splice(begin, end_line, self._texts[begin : start_line - 1] + replacement)
+        self.version += 1
+
+    def issues(self) -> list[Issue]:
+        """Issues ordered by rule, then position; document-level issues follow each rule's findings."""
+        ranked: list[tuple[int, int, int, int, Issue]] = []
+        for number, line in enumerate(self._lines, 1):
+            for rule_index, issue in line.issues:
+                ranked.append((rule_index, 0, number, issue.column or 0, replace(issue, line=number)))
+        facts = {key: (first << _LINE_SHIFT) | self._lines[first].facts[key] for key, first in self._first.items()}
+        for rule_index, issue in self.linter.document_issues(lambda: self.text, facts, _locate):
+            ranked.append((rule_index, 1, 0, 0, issue))
+        ranked.sort(key=lambda item: item[:4])
+        return [item[4] for item in ranked]
+
+
+class SessionStore:
+    """Open lint sessions, evicted after ``idle_timeout`` seconds or beyond ``max_sessions``."""
+
+    def __init__(
+        self,
+        linter: Linter,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ) -> None:
+        self.linter = linter
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, LintSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        sessions = self._sessions
+        while sessions:
+            session_id, session = next(iter(sessions.items()))
+            if len(sessions) <= self.max_sessions and now - session.last_used < self.idle_timeout:
+                break
+            del sessions[session_id]
+
+    def open(self, text: str) -> tuple[str, LintSession]:
+        session = LintSession(self.linter, text)
+        session_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._sessions[session_id] = session
+            self._evict(session.last_used)
+        return session_id, session
+
+    def get(self, session_id: str) -> LintSession | None:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,91 @@
+"""MinHash signatures and LSH banding for near-duplicate prompt detection.
+
+Texts are reduced to word shingles and summarized with one-permutation MinHash:
+each shingle is hashed once and the hash space is split into ``SIGNATURE_SIZE``
+bins, keeping the minimum per bin. Empty bins borrow from the next non-empty
+bin, so any two signatures agree in a bin with probability close to the
+Jaccard similarity of their shingle sets. That costs one hash per shingle
+instead of one per shingle and permutation.
+
+Signatures are cut into ``BANDS`` bands of ``ROWS`` values. Two texts become
+candidates when any band matches exactly, which happens with probability
+``1 - (1 - s**ROWS) ** BANDS`` for similarity ``s``: about 0.5 at s = 0.42 and
+above 0.99 from s = 0.7.
+"""
+
+from __future__ import annotations
+
+from array import array
+import hashlib
+import re
+import struct
+
+SHINGLE_WORDS = 3
+SIGNATURE_SIZE = 128
+ROWS = 4
+BANDS = SIGNATURE_SIZE // ROWS
+DEFAULT_THRESHOLD = 0.8
+
+_WORD_PATTERN = re.compile(r"\w+")
+_EMPTY = (1 << 64) - 1
+_BIN_SHIFT = 64 - (SIGNATURE_SIZE - 1).bit_length()
+_BAND = struct.Struct(f"<{ROWS}Q")
+
+
+def shingles(text: str) -> set[str]:
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[index : index + SHINGLE_WORDS]) for index in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: str) -> array | None:
+    """The MinHash signature of ``text``, or None when it has no words."""
+    found = shingles(text)
+    if not found:
+        return None
+    bins = array("Q", [_EMPTY]) * SIGNATURE_SIZE
+    for shingle in found:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        # The top bits pick the bin; the value itself is the bin's candidate minimum.
+        index = value >> _BIN_SHIFT
+        if value < bins[index]:
+            bins[index] = value
+    # Densify: each empty bin takes the nearest filled bin to its right, circularly,
+    # offset by the distance so borrowed values differ from the bin they came from.
+    filled = [index for index in range(SIGNATURE_SIZE) if bins[index] != _EMPTY]
+    if len(filled) < SIGNATURE_SIZE:
+        dense = array("Q", bins)
+        for index in range(SIGNATURE_SIZE):
+            if bins[index] != _EMPTY:
+                continue
+            distance = 1
+            while bins[(index + distance) % SIGNATURE_SIZE] == _EMPTY:
+                distance += 1
+            dense[index] = (bins[(index + distance) % SIGNATURE_SIZE] + distance * 0x9E3779B97F4A7C15) & _EMPTY
+        bins = dense
+    return bins
+
+
+def band_keys(values: array) -> list[int]:
+    """One bucket key per band, as signed 64-bit integers for SQLite."""
+    keys: list[int] = []
+    for band in range(BANDS):
+        chunk = _BAND.pack(*values[band * ROWS : (band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+def estimate(first: array, second: array) -> float:
+    """Estimated Jaccard similarity: the share of bins on which two signatures agree."""
+    return sum(a == b for a, b in zip(first, second)) / SIGNATURE_SIZE
+
+
+def to_bytes(values: array) -> bytes:
+    return values.tobytes()
+
+
+def from_bytes(data: bytes) -> array:
+    values = array("Q")
+    values.frombytes(data)
+    return values
@@ -0,0 +1,101 @@
+"""Lint snapshots stored with saved versions, and issue deltas between them.
+
+A snapshot is taken when a version is saved and tagged with the rule-set
+fingerprint. Reading one under a different rule set re-lints that version once
+and replaces the stored snapshot, so diffs never lint a version twice.
+Rule queries in search re-lint every stale version first, in batches.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, Mapping
+
+from promptforge.issues import Issue
+from promptforge.lint import Linter, select_rules
+from promptforge.search import parse_query
+from promptforge.serialize import decode_issues, encode_issues, issue_dict
+from promptforge.storage import Snapshot, get_store, search_versions, store_generation
+
+_REFRESH_BATCH = 512
+# Fingerprint -> store generation at which every version had a snapshot under it.
+_complete: dict[str, str] = {}
+
+
+def take_snapshot(linter: Linter, text: str) -> Snapshot:
+    return linter.fingerprint, encode_issues(linter.lint(text))
+
+
+def version_issues(linter: Linter, texts: Mapping[str, str]) -> dict[str, tuple[Issue, ...]]:
+    """Current-rule-set issues of each version in ``texts`` (id -> text), from snapshots where possible."""
+    store = get_store()
+    snapshots = store.load_snapshots(texts)
+    issues: dict[str, tuple[Issue, ...]] = {}
+    for file_id, text in texts.items():
+        snapshot = snapshots.get(file_id)
+        if snapshot is None or snapshot[0] != linter.fingerprint:
+            # Saved before snapshots existed, or under another rule set.
+            snapshot = take_snapshot(linter, text)
+            store.save_snapshot(file_id, snapshot)
+        issues[file_id] = decode_issues(snapshot[1])
+    return issues
+
+
+def refresh_snapshots(linter: Linter) -> int:
+    """Snapshot every version lacking one under the current rule set; returns how many were taken."""
+    store = get_store()
+    # Snapshots do not bump the generation, so one read before refreshing stays valid.
+    generation = store_generation()
+    if _complete.get(linter.fingerprint) == generation:
+        return 0
+    taken = 0
+    while file_ids := store.stale_snapshots(linter.fingerprint, _REFRESH_BATCH):
+        snapshots = {}
+        for file_id in file_ids:
+            text = store.load(file_id)
+            if text is not None:
+                snapshots[file_id] = take_snapshot(linter, text)
+        store.save_snapshots(snapshots)
+        taken += len(snapshots)
+        if len(snapshots) < len(file_ids):
+            break
+    _complete[linter.fingerprint] = generation
+    return taken
+
+
+def search(linter: Linter, query: str, limit: int | None = None, offset: int = 0) -> list[dict]:
+    """Saved versions matching ``query`` (see ``promptforge.search``), best match first.
+
+    Raises ``ValueError`` for an empty query or an unknown rule id.
+    """
+    parsed = parse_query(query)
+    if parsed.rules:
+        select_rules(linter.rules, parsed.rules, ())
+        refresh_snapshots(linter)
+    return search_versions(parsed, linter.fingerprint, limit, offset)
+
+
+def _key(issue: Issue) -> tuple[str, str, str]:
+    # Positions are left out so issues that merely moved with an edit still match.
+    return issue.rule_id, issue.severity, issue.message
+
+
+def _surplus(issues: Iterable[Issue], others: Iterable[Issue]) -> list[Issue]:
+    remaining = Counter(_key(issue) for issue in others)
+    surplus: list[Issue] = []
+    for issue in issues:
+        key = _key(issue)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            surplus.append(issue)
+    return surplus
+
+
+def issue_delta(before: Iterable[Issue], after: Iterable[Issue]) -> dict:
+    """Issues ``after`` has that ``before`` lacks ("added") and the reverse ("removed")."""
+    before, after = list(before), list(after)
+    return {
+        "added": [issue_dict(issue) for issue in _surplus(after, before)],
+        "removed": [issue_dict(issue) for issue in _surplus(before, after)],
+    }
@@ -2,13 +2,75 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from contextlib import contextmanager
 import datetime as dt
+import json
 import os
+import queue
 import re
+import secrets
+import sqlite3
+import threading
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping
+
+from promptforge import metrics, similarity
+from promptforge.blame import carry_origins, decode_origins, encode_origins
+from promptforge.delta import apply_delta, decode_delta, decode_text, delta_from_opcodes, encode_delta, encode_text
+from promptforge.diff import Opcode, opcodes, split_lines
+from promptforge.search import SearchQuery
 
 DATA_DIR = Path(os.getenv("PROMPTFORGE_DATA_DIR", "/tmp/promptforge-data"))
-_VERSION_PATTERN = re.compile(r"^[0-9]{14}_[A-Za-z0-9_-]+\.txt$")
+DB_FILENAME = "versions.sqlite3"
+# Every Nth version of a label is stored in full; the rest are deltas. 1 disables deltas.
+SNAPSHOT_INTERVAL = max(1, int(os.getenv("PROMPTFORGE_SNAPSHOT_INTERVAL", "16")))
+# Concurrent saves in one process share a transaction; set to 0 to commit each alone.
+GROUP_COMMIT = os.getenv("PROMPTFORGE_GROUP_COMMIT", "1") != "0"
+# Sync the WAL on every commit rather than only at checkpoints.
+DURABLE = os.getenv("PROMPTFORGE_DURABLE", "0") == "1"
+# Ids are a microsecond stamp plus the label; legacy ids have second precision.
+_VERSION_PATTERN = re.compile(r"^[0-9]{14}(?:[0-9]{6})?_[A-Za-z0-9_-]+\.txt$")
+_TIMESTAMP_FORMAT = "%Y%m%d%H%M%S"
+_STAMP_FORMAT = "%Y%m%d%H%M%S%f"
+_MAX_GROUP = 256
+_POOL_SIZE = 8
+_TEXT_CACHE_CHARS = 32 * 1024 * 1024
+_SCHEMA_VERSION = 6
+# SQLite's default cap on host parameters per statement is 32766 since 3.32.
+_MAX_PARAMS = 30000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS versions ("
+    "id TEXT PRIMARY KEY, label TEXT NOT NULL, created_at TEXT NOT NULL, "
+    "kind TEXT NOT NULL, base_id TEXT, depth INTEGER NOT NULL, data BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS versions_created ON versions (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS versions_label_created ON versions (label, created_at, id)",
+    "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    # Lint results per version, tagged with the rule-set fingerprint that produced them.
+    "CREATE TABLE IF NOT EXISTS lint_snapshots ("
+    "version_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, issues TEXT NOT NULL)",
+    # MinHash signature per version (NULL when the text has no words) and its LSH band keys.
+    "CREATE TABLE IF NOT EXISTS similarity_signatures (version_id TEXT PRIMARY KEY, signature BLOB)",
+    "CREATE TABLE IF NOT EXISTS similarity_buckets ("
+    "band INTEGER NOT NULL, bucket INTEGER NOT NULL, version_id TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS similarity_buckets_key ON similarity_buckets (band, bucket)",
+    # Rule ids present in each lint snapshot, for rule queries in search.
+    "CREATE TABLE IF NOT EXISTS lint_rule_hits ("
+    "rule_id TEXT NOT NULL, fingerprint TEXT NOT NULL, version_id TEXT NOT NULL, "
+    "PRIMARY KEY (rule_id, fingerprint, version_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS lint_rule_hits_version ON lint_rule_hits (version_id)",
+    # Line origins of the latest version of each label (see promptforge.blame).
+    "CREATE TABLE IF NOT EXISTS label_blame (label TEXT PRIMARY KEY, version_id TEXT NOT NULL, origins BLOB NOT NULL)",
+)
+# Full-text index over labels and texts. It is contentless, since the texts
+# already live in versions; search_documents maps its rowids to version ids.
+_SEARCH_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS search_documents (doc_id INTEGER PRIMARY KEY, version_id TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(label, text, content='')",
+)
+# Labels are short, so a hit there counts for more than one in the text.
+_LABEL_WEIGHT = 2.0
 
 
 def sanitize_label(label: str) -> str:
@@ -22,35 +84,813 @@ def version_path(file_id: str) -> Path:
     return DATA_DIR / file_id
 
 
-def list_versions() -> list[dict]:
-    versions: list[dict] = []
-    if not DATA_DIR.exists():
-        return versions
-    for path in sorted(DATA_DIR.glob("*.txt")):
-        parts = path.stem.split("_", 1)
-        timestamp = parts[0]
-        label = parts[1] if len(parts) > 1 else "untitled"
+def _split_id(file_id: str) -> tuple[str, str]:
+    stamp, _, rest = file_id.partition("_")
+    return stamp[:14], rest[: -len(".txt")] or "untitled"
+
+
+def _display_timestamp(timestamp: str) -> str:
+    try:
+        return dt.datetime.strptime(timestamp, _TIMESTAMP_FORMAT).isoformat(timespec="seconds")
+    except ValueError:
+        return timestamp
+
+
+def _timestamp_key(value: str | dt.datetime) -> str:
+    # Accepts ISO-8601 strings (as returned by list_versions) or datetimes.
+    if isinstance(value, str):
+        value = dt.datetime.fromisoformat(value)
+    return value.strftime(_TIMESTAMP_FORMAT)
+
+
+class _TextCache:
+    """Thread-safe LRU of reconstructed version texts, bounded by total characters."""
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._texts: OrderedDict[str, str] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, file_id: str) -> str | None:
+        with self._lock:
+            text = self._texts.get(file_id)
+            if text is not None:
+                self._texts.move_to_end(file_id)
+            return text
+
+    def put(self, file_id: str, text: str) -> None:
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            previous = self._texts.pop(file_id, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._texts[file_id] = text
+            self._size += len(text)
+            while self._size > self.max_chars:
+                _, evicted = self._texts.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._texts.clear()
+            self._size = 0
+
+
+# A lint result as stored: (rule-set fingerprint, issues encoded as a JSON array).
+Snapshot = tuple[str, str]
+
+
+class _PendingSave:
+    __slots__ = ("label", "text", "snapshot", "file_id", "error")
+
+    def __init__(self, label: str, text: str, snapshot: Snapshot | None) -> None:
+        self.label = label
+        self.text = text
+        self.snapshot = snapshot
+        self.file_id: str | None = None
+        self.error: BaseException | None = None
+
+
+class VersionStore:
+    """SQLite store (WAL mode) for saved prompt versions with a small connection pool.
+
+    Each label's history is a chain: every ``SNAPSHOT_INTERVAL``-th version is a
+    compressed full snapshot and the versions in between are compressed line
+    deltas against the previous version of the same label.
+
+    New versions get ids from a microsecond stamp that is strictly increasing
+    across every process sharing the database, so saves never collide. With
+    ``group_commit`` the saves queued while another one is committing are
+    written together in the next transaction, paying for one commit (and, when
+    ``durable``, one fsync) per batch instead of per save.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        group_commit: bool = GROUP_COMMIT,
+        durable: bool = DURABLE,
+    ) -> None:
+        self.directory = directory
+        self.path = directory / DB_FILENAME
+        self.snapshot_interval = snapshot_interval
+        self.group_commit = group_commit
+        self.durable = durable
+        self._pool: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._texts = _TextCache(_TEXT_CACHE_CHARS)
+        self._queue: list[_PendingSave] = []
+        self._queue_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        # Set once versions saved before each index existed are indexed.
+        self._similarity_ready = False
+        self._search_ready = False
+        directory.mkdir(parents=True, exist_ok=True)
+        with self.connection() as connection:
+            (schema_version,) = connection.execute("PRAGMA user_version").fetchone()
+            if schema_version < _SCHEMA_VERSION:
+                self._migrate(connection, schema_version)
+            imported = connection.execute(
+                "SELECT value FROM store_meta WHERE key = 'imported_files'"
+            ).fetchone()
+            # Identifies this database in cache validators, so a recreated store
+            # never reuses the generations of the one it replaced.
+            connection.execute(
+                "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)", (secrets.token_hex(8),)
+            )
+            self.store_id = connection.execute("SELECT value FROM store_meta WHERE key = 'store_id'").fetchone()[0]
+        if imported is None:
+            self.import_directory(directory)
+
+    def _migrate(self, connection: sqlite3.Connection, schema_version: int) -> None:
+        connection.execute("BEGIN IMMEDIATE")
+        legacy_rows: list[tuple[str, str, str, str]] = []
+        if self._has_column(connection, "versions", "text"):
+            # Version 1 kept every text in full; re-encode it as snapshot/delta chains.
+            legacy_rows = connection.execute(
+                "SELECT id, label, created_at, text FROM versions ORDER BY created_at, id"
+            ).fetchall()
+            connection.execute("DROP TABLE versions")
+        for statement in _SCHEMA + _SEARCH_SCHEMA:
+            connection.execute(statement)
+        for row in legacy_rows:
+            self._insert(connection, *row)
+        if schema_version < 5:
+            # Rule hits were not recorded for snapshots taken before version 5.
+            for file_id, fingerprint, issues in connection.execute(
+                "SELECT version_id, fingerprint, issues FROM lint_snapshots"
+            ).fetchall():
+                self._put_rule_hits(connection, file_id, fingerprint, issues)
+        connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _has_column(connection: sqlite3.Connection, table: str, column: str) -> bool:
+        return any(row[1] == column for row in connection.execute(f"PRAGMA table_info({table})"))
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={'FULL' if self.durable else 'NORMAL'}")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._open()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            if self._pool.qsize() < _POOL_SIZE:
+                self._pool.put(connection)
+            else:
+                connection.close()
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="import")
+    def import_directory(self, directory: Path) -> int:
+        # One-time migration of the legacy one-file-per-version layout.
+        rows = []
+        if directory.exists():
+            for path in sorted(directory.glob("*.txt")):
+                if not _VERSION_PATTERN.match(path.name):
+                    continue
+                timestamp, label = _split_id(path.name)
+                rows.append((path.name, label, timestamp, path.read_text(encoding="utf-8")))
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            imported = self._insert_many(connection, rows, replace=False)
+            if imported:
+                self._bump_generation(connection)
+            connection.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('imported_files', ?)",
+                (str(directory),),
+            )
+            connection.execute("COMMIT")
+        return imported
+
+    def _insert_many(
+        self, connection: sqlite3.Connection, rows: Iterable[tuple[str, str, str, str]], replace: bool
+    ) -> int:
+        count = 0
+        for file_id, label, timestamp, text in rows:
+            if not replace and connection.execute("SELECT 1 FROM versions WHERE id = ?", (file_id,)).fetchone():
+                continue
+            self._insert(connection, file_id, label, timestamp, text)
+            count += 1
+        return count
+
+    def _insert(self, connection: sqlite3.Connection, file_id: str, label: str, timestamp: str, text: str) -> None:
+        kind, base_id, depth, data = "full", None, 0, encode_text(text)
+        previous = connection.execute(
+            "SELECT id, depth FROM versions WHERE label = ? AND id < ? ORDER BY id DESC LIMIT 1",
+            (label, file_id),
+        ).fetchone()
+        lines = split_lines(text)
+        codes = None
+        if previous is not None:
+            base_text = self._reconstruct(connection, previous[0])
+            if base_text is not None:
+                # One diff serves both the delta and the blame update.
+                codes = opcodes(split_lines(base_text), lines)
+        if codes is not None and previous[1] + 1 < self.snapshot_interval:
+            delta = encode_delta(delta_from_opcodes(codes, lines))
+            # Tiny or unrelated texts can make a delta larger than the snapshot.
+            if len(delta) < len(data):
+                kind, base_id, depth, data = "delta", previous[0], previous[1] + 1, delta
+        connection.execute(
+            "INSERT INTO versions (id, label, created_at, kind, base_id, depth, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_id, label, timestamp, kind, base_id, depth, data),
+        )
+        self._index_similarity(connection, file_id, text)
+        self._index_search(connection, file_id, label, text)
+        self._update_blame(connection, file_id, label, None if previous is None else previous[0], codes, len(lines))
+
+    @staticmethod
+    def _index_similarity(connection: sqlite3.Connection, file_id: str, text: str) -> None:
+        values = similarity.signature(text)
+        connection.execute(
+            "INSERT OR REPLACE INTO similarity_signatures (version_id, signature) VALUES (?, ?)",
+            (file_id, None if values is None else similarity.to_bytes(values)),
+        )
+        if values is not None:
+            connection.executemany(
+                "INSERT INTO similarity_buckets (band, bucket, version_id) VALUES (?, ?, ?)",
+                [(band, key, file_id) for band, key in enumerate(similarity.band_keys(values))],
+            )
+
+    @staticmethod
+    def _index_search(connection: sqlite3.Connection, file_id: str, label: str, text: str) -> None:
+        cursor = connection.execute("INSERT OR IGNORE INTO search_documents (version_id) VALUES (?)", (file_id,))
+        if cursor.rowcount:
+            connection.execute(
+                "INSERT INTO search_index (rowid, label, text) VALUES (?, ?, ?)", (cursor.lastrowid, label, text)
+            )
+
+    @staticmethod
+    def _update_blame(
+        connection: sqlite3.Connection,
+        file_id: str,
+        label: str,
+        previous_id: str | None,
+        codes: list[Opcode] | None,
+        line_count: int,
+    ) -> None:
+        row = connection.execute("SELECT version_id, origins FROM label_blame WHERE label = ?", (label,)).fetchone()
+        if previous_id is None and row is None:
+            origins = [file_id] * line_count
+        elif row is not None and codes is not None and row[0] == previous_id:
+            origins = carry_origins(decode_origins(row[1]), codes, file_id)
+        else:
+            # Inserted behind the latest version, or the predecessor's origins
+            # are unknown; the next blame query replays the label once.
+            connection.execute("DELETE FROM label_blame WHERE label = ?", (label,))
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO label_blame (label, version_id, origins) VALUES (?, ?, ?)",
+            (label, file_id, encode_origins(origins)),
+        )
+
+    def _rebuild_blame(self, connection: sqlite3.Connection, label: str) -> tuple[str, list[str]] | None:
+        file_id: str | None = None
+        origins: list[str] = []
+        previous_lines: list[str] | None = None
+        for (version_id,) in connection.execute(
+            "SELECT id FROM versions WHERE label = ? ORDER BY id", (label,)
+        ).fetchall():
+            text = self._reconstruct(connection, version_id)
+            if text is None:
+                continue
+            lines = split_lines(text)
+            if previous_lines is None:
+                origins = [version_id] * len(lines)
+            else:
+                origins = carry_origins(origins, opcodes(previous_lines, lines), version_id)
+            file_id, previous_lines = version_id, lines
+        if file_id is None:
+            return None
+        connection.execute(
+            "INSERT OR REPLACE INTO label_blame (label, version_id, origins) VALUES (?, ?, ?)",
+            (label, file_id, encode_origins(origins)),
+        )
+        return file_id, origins
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="blame")
+    def blame(self, label: str) -> tuple[str, str, list[str]] | None:
+        """The latest version of ``label`` as ``(id, text, origins)``, or None if it has none.
+
+        ``origins`` holds, per line of the text, the id of the version that
+        introduced it. It is read from the blame index; only labels missing from
+        the index (older stores, out-of-order imports) are replayed, once.
+        """
+        with self.connection() as connection:
+            latest = connection.execute(
+                "SELECT id FROM versions WHERE label = ? ORDER BY id DESC LIMIT 1", (label,)
+            ).fetchone()
+            if latest is None:
+                return None
+            row = connection.execute(
+                "SELECT version_id, origins FROM label_blame WHERE label = ?", (label,)
+            ).fetchone()
+            if row is not None and row[0] == latest[0]:
+                file_id, origins = row[0], decode_origins(row[1])
+            else:
+                connection.execute("BEGIN IMMEDIATE")
+                rebuilt = self._rebuild_blame(connection, label)
+                connection.execute("COMMIT")
+                if rebuilt is None:
+                    return None
+                file_id, origins = rebuilt
+            text = self._reconstruct(connection, file_id)
+        if text is None:
+            return None
+        return file_id, text, origins
+
+    @staticmethod
+    def _bump_generation(connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def generation(self) -> int:
+        """A counter bumped by every write, so readers can tell whether listings changed."""
+        with self.connection() as connection:
+            row = connection.execute("SELECT value FROM store_meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _reconstruct(self, connection: sqlite3.Connection, file_id: str) -> str | None:
+        deltas: list[tuple[str, bytes]] = []
+        current = file_id
+        while True:
+            text = self._texts.get(current)
+            if text is not None:
+                break
+            row = connection.execute(
+                "SELECT kind, base_id, data FROM versions WHERE id = ?", (current,)
+            ).fetchone()
+            if row is None:
+                if deltas:
+                    raise RuntimeError(f"Version {deltas[-1][0]} refers to missing base {current}")
+                return None
+            kind, base_id, data = row
+            if kind == "full":
+                text = decode_text(data)
+                self._texts.put(current, text)
+                break
+            deltas.append((current, data))
+            current = base_id
+        for version_id, data in reversed(deltas):
+            text = apply_delta(text, decode_delta(data))
+            self._texts.put(version_id, text)
+        return text
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="save")
+    def save(self, file_id: str, label: str, timestamp: str, text: str) -> None:
+        """Insert a version under a caller-chosen id; raises ``sqlite3.IntegrityError`` if it exists."""
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            self._insert(connection, file_id, label, timestamp, text)
+            self._bump_generation(connection)
+            connection.execute("COMMIT")
+        # Freshly saved versions are the likeliest diff targets and future delta bases.
+        self._texts.put(file_id, text)
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="save")
+    def save_new(self, label: str, text: str, snapshot: Snapshot | None = None) -> str:
+        """Save a new version of ``label`` under a fresh id and return the id.
+
+        A lint ``snapshot`` given here is written in the same transaction.
+        """
+        pending = _PendingSave(label, text, snapshot)
+        if not self.group_commit:
+            self._commit([pending])
+        else:
+            with self._queue_lock:
+                self._queue.append(pending)
+            with self._commit_lock:
+                # Whoever holds the lock commits everything queued so far, so by the
+                # time a waiter gets here its save has usually been written already.
+                # More than _MAX_GROUP saves ahead of it take several batches.
+                while pending.file_id is None and pending.error is None:
+                    with self._queue_lock:
+                        batch = self._queue[:_MAX_GROUP]
+                        del self._queue[:_MAX_GROUP]
+                    try:
+                        self._commit(batch)
+                    except BaseException:
+                        # Interrupted: hand the other unwritten saves to the next committer.
+                        with self._queue_lock:
+                            self._queue[:0] = [
+                                other for other in batch if other is not pending and other.file_id is None
+                            ]
+                        raise
+        if pending.error is not None:
+            raise pending.error
+        return pending.file_id
+
+    def _commit(self, batch: list[_PendingSave]) -> None:
         try:
-            parsed_time = dt.datetime.strptime(timestamp, "%Y%m%d%H%M%S")
-            timestamp_display = parsed_time.isoformat(timespec="seconds")
-        except ValueError:
-            timestamp_display = timestamp
-        versions.append({"id": path.name, "label": label, "timestamp": timestamp_display})
-    return versions
+            self._write(batch)
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0].error = exc
+                return
+            # One bad save must not fail the others in its group; retry them alone.
+            for pending in batch:
+                self._commit([pending])
+
+    def _write(self, batch: list[_PendingSave]) -> None:
+        with self.connection() as connection:
+            # The write lock makes id allocation safe across processes too.
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT value FROM store_meta WHERE key = 'last_stamp'").fetchone()
+            last = int(row[0]) if row else 0
+            now = dt.datetime.utcnow()
+            timestamp = now.strftime(_TIMESTAMP_FORMAT)
+            stamp = int(now.strftime(_STAMP_FORMAT))
+            ids: list[str] = []
+            for pending in batch:
+                stamp = last = max(stamp, last + 1)
+                file_id = f"{stamp}_{pending.label}.txt"
+                self._insert(connection, file_id, pending.label, timestamp, pending.text)
+                if pending.snapshot is not None:
+                    self._put_snapshot(connection, file_id, pending.snapshot)
+                ids.append(file_id)
+            connection.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('last_stamp', ?)", (str(last),)
+            )
+            self._bump_generation(connection)
+            connection.execute("COMMIT")
+        for pending, file_id in zip(batch, ids):
+            self._texts.put(file_id, pending.text)
+            pending.file_id = file_id
+
+    @staticmethod
+    def _put_rule_hits(connection: sqlite3.Connection, file_id: str, fingerprint: str, issues: str) -> None:
+        connection.execute("DELETE FROM lint_rule_hits WHERE version_id = ?", (file_id,))
+        connection.executemany(
+            "INSERT OR IGNORE INTO lint_rule_hits (rule_id, fingerprint, version_id) VALUES (?, ?, ?)",
+            [(rule_id, fingerprint, file_id) for rule_id in {issue["rule_id"] for issue in json.loads(issues)}],
+        )
+
+    def _put_snapshot(self, connection: sqlite3.Connection, file_id: str, snapshot: Snapshot) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO lint_snapshots (version_id, fingerprint, issues) VALUES (?, ?, ?)",
+            (file_id, *snapshot),
+        )
+        self._put_rule_hits(connection, file_id, *snapshot)
+
+    def save_snapshot(self, file_id: str, snapshot: Snapshot) -> None:
+        """Store or replace the lint snapshot of an existing version."""
+        self.save_snapshots({file_id: snapshot})
+
+    def save_snapshots(self, snapshots: Mapping[str, Snapshot]) -> None:
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for file_id, snapshot in snapshots.items():
+                self._put_snapshot(connection, file_id, snapshot)
+            connection.execute("COMMIT")
+
+    def stale_snapshots(self, fingerprint: str, limit: int) -> list[str]:
+        """Up to ``limit`` version ids with no snapshot taken under ``fingerprint``."""
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT v.id FROM versions v LEFT JOIN lint_snapshots s "
+                "ON s.version_id = v.id AND s.fingerprint = ? WHERE s.version_id IS NULL ORDER BY v.id LIMIT ?",
+                (fingerprint, limit),
+            ).fetchall()
+        return [file_id for (file_id,) in rows]
+
+    def load_snapshots(self, file_ids: Iterable[str]) -> dict[str, Snapshot]:
+        file_ids = list(file_ids)
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT version_id, fingerprint, issues FROM lint_snapshots "
+                f"WHERE version_id IN ({', '.join('?' * len(file_ids))})",
+                file_ids,
+            ).fetchall()
+        return {file_id: (fingerprint, issues) for file_id, fingerprint, issues in rows}
+
+    def clear_cache(self) -> None:
+        self._texts.clear()
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="load")
+    def load(self, file_id: str) -> str | None:
+        text = self._texts.get(file_id)
+        if text is not None:
+            return text
+        with self.connection() as connection:
+            return self._reconstruct(connection, file_id)
+
+    def _backfill(
+        self, connection: sqlite3.Connection, table: str, index: Callable[[sqlite3.Connection, str, str, str], None]
+    ) -> None:
+        # Every insert indexes itself, so this only catches up once on older stores.
+        missing = connection.execute(
+            f"SELECT id, label FROM versions WHERE id NOT IN (SELECT version_id FROM {table}) ORDER BY id"
+        ).fetchall()
+        for file_id, label in missing:
+            text = self._reconstruct(connection, file_id)
+            if text is not None:
+                index(connection, file_id, label, text)
+
+    def _ensure_similarity_index(self) -> None:
+        if self._similarity_ready:
+            return
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            self._backfill(
+                connection,
+                "similarity_signatures",
+                lambda connection, file_id, label, text: self._index_similarity(connection, file_id, text),
+            )
+            connection.execute("COMMIT")
+        self._similarity_ready = True
+
+    def _ensure_search_index(self) -> None:
+        if self._search_ready:
+            return
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'").fetchone():
+                # Dropped by hand (it is the one index worth rebuilding from scratch);
+                # its document map is meaningless without it.
+                connection.execute("DROP TABLE IF EXISTS search_documents")
+            for statement in _SEARCH_SCHEMA:
+                connection.execute(statement)
+            self._backfill(connection, "search_documents", self._index_search)
+            connection.execute("COMMIT")
+        self._search_ready = True
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="search")
+    def search(
+        self, query: SearchQuery, fingerprint: str, limit: int | None = None, offset: int = 0
+    ) -> list[tuple[str, str, str, float | None]]:
+        """Versions matching ``query`` as ``(id, label, created_at, score)``.
+
+        Text queries are ranked by BM25 (higher scores first); rule-only queries
+        have no score and list the newest versions first. Rule terms match lint
+        snapshots taken under ``fingerprint``.
+        """
+        self._ensure_search_index()
+        clauses: list[str] = []
+        params: list[object] = []
+        for rule_id in query.rules:
+            clauses.append("v.id IN (SELECT version_id FROM lint_rule_hits WHERE rule_id = ? AND fingerprint = ?)")
+            params.extend((rule_id, fingerprint))
+        if query.match is not None:
+            clauses.insert(0, "search_index MATCH ?")
+            params.insert(0, query.match)
+            sql = (
+                f"SELECT v.id, v.label, v.created_at, -bm25(search_index, {_LABEL_WEIGHT}, 1.0) AS score "
+                "FROM search_index JOIN search_documents d ON d.doc_id = search_index.rowid "
+                f"JOIN versions v ON v.id = d.version_id WHERE {' AND '.join(clauses)} "
+                "ORDER BY score DESC, v.created_at DESC, v.id DESC LIMIT ? OFFSET ?"
+            )
+        else:
+            sql = (
+                f"SELECT v.id, v.label, v.created_at, NULL FROM versions v WHERE {' AND '.join(clauses)} "
+                "ORDER BY v.created_at DESC, v.id DESC LIMIT ? OFFSET ?"
+            )
+        params.extend((-1 if limit is None else limit, offset))
+        with self.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _signatures(connection: sqlite3.Connection, file_ids: list[str]) -> dict[str, tuple[bytes, str, str]]:
+        found: dict[str, tuple[bytes, str, str]] = {}
+        for start in range(0, len(file_ids), _MAX_PARAMS):
+            chunk = file_ids[start : start + _MAX_PARAMS]
+            rows = connection.execute(
+                "SELECT s.version_id, s.signature, v.label, v.created_at FROM similarity_signatures s "
+                f"JOIN versions v ON v.id = s.version_id WHERE s.version_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((file_id, (data, label, created_at)) for file_id, data, label, created_at in rows)
+        return found
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="similar")
+    def similar(
+        self, file_id: str, threshold: float, limit: int | None = None
+    ) -> list[tuple[str, str, str, float]] | None:
+        """Versions whose estimated similarity to ``file_id`` is at least ``threshold``, most similar first.
+
+        Returns None when ``file_id`` does not exist. Only versions sharing an LSH
+        bucket with it are compared, so the cost follows the number of near
+        duplicates rather than the size of the store.
+        """
+        self._ensure_similarity_index()
+        with self.connection() as connection:
+            row = connection.execute(
+                "SELECT signature FROM similarity_signatures WHERE version_id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] is None:
+                return []
+            values = similarity.from_bytes(row[0])
+            candidates: set[str] = set()
+            for band, key in enumerate(similarity.band_keys(values)):
+                candidates.update(
+                    candidate
+                    for (candidate,) in connection.execute(
+                        "SELECT version_id FROM similarity_buckets WHERE band = ? AND bucket = ?", (band, key)
+                    )
+                )
+            candidates.discard(file_id)
+            signatures = self._signatures(connection, sorted(candidates))
+        matches = []
+        for candidate, (data, label, created_at) in signatures.items():
+            score = similarity.estimate(values, similarity.from_bytes(data))
+            if score >= threshold:
+                matches.append((candidate, label, created_at, score))
+        matches.sort(key=lambda match: (-match[3], match[0]))
+        return matches if limit is None else matches[:limit]
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="clusters")
+    def clusters(self, threshold: float) -> list[list[str]]:
+        """Groups of two or more versions linked by estimated similarity of at least ``threshold``.
+
+        Only versions that share an LSH bucket are compared. Within a bucket each
+        version is compared with the bucket's leaders (versions that matched no
+        earlier leader) and joins the first one it is similar to, so even a bucket
+        of many copies costs about one comparison per member.
+        """
+        self._ensure_similarity_index()
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT band, bucket, version_id FROM similarity_buckets WHERE (band, bucket) IN "
+                "(SELECT band, bucket FROM similarity_buckets GROUP BY band, bucket HAVING COUNT(*) > 1) "
+                "ORDER BY band, bucket, version_id"
+            ).fetchall()
+            signatures = {
+                file_id: similarity.from_bytes(data)
+                for file_id, (data, _, _) in self._signatures(connection, sorted({row[2] for row in rows})).items()
+            }
+
+        parents: dict[str, str] = {}
+
+        def find(file_id: str) -> str:
+            parents.setdefault(file_id, file_id)
+            while parents[file_id] != file_id:
+                parents[file_id] = parents[parents[file_id]]
+                file_id = parents[file_id]
+            return file_id
+
+        leaders: list[str] = []
+        previous_bucket = None
+        for band, bucket, file_id in rows:
+            if (band, bucket) != previous_bucket:
+                leaders, previous_bucket = [], (band, bucket)
+            values = signatures[file_id]
+            for leader in leaders:
+                if similarity.estimate(values, signatures[leader]) >= threshold:
+                    first, second = find(leader), find(file_id)
+                    if first != second:
+                        parents[max(first, second)] = min(first, second)
+                    break
+            else:
+                leaders.append(file_id)
+
+        groups: dict[str, list[str]] = {}
+        for file_id in list(parents):
+            groups.setdefault(find(file_id), []).append(file_id)
+        return sorted((sorted(members) for members in groups.values()), key=lambda cluster: (-len(cluster), cluster))
+
+    @metrics.timed(metrics.STORAGE_SECONDS, operation="list")
+    def list(
+        self,
+        label: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[tuple[str, str, str]]:
+        clauses: list[str] = []
+        params: list[object] = []
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at <= ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.extend((-1 if limit is None else limit, offset))
+        with self.connection() as connection:
+            return connection.execute(
+                f"SELECT id, label, created_at FROM versions{where} ORDER BY created_at, id LIMIT ? OFFSET ?",
+                params,
+            ).fetchall()
+
+
+_stores: dict[Path, VersionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store() -> VersionStore:
+    # Resolved per call so tests and tools can repoint DATA_DIR at runtime.
+    with _stores_lock:
+        store = _stores.get(DATA_DIR)
+        if store is None:
+            store = _stores[DATA_DIR] = VersionStore(DATA_DIR)
+        return store
+
+
+def list_versions(
+    label: str | None = None,
+    since: str | dt.datetime | None = None,
+    until: str | dt.datetime | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    rows = get_store().list(
+        label=sanitize_label(label) if label else None,
+        since=_timestamp_key(since) if since else None,
+        until=_timestamp_key(until) if until else None,
+        limit=limit,
+        offset=offset,
+    )
+    return [
+        {"id": file_id, "label": row_label, "timestamp": _display_timestamp(created_at)}
+        for file_id, row_label, created_at in rows
+    ]
+
+
+def store_generation() -> str:
+    """A validator for the version listing: changes whenever any version is written."""
+    store = get_store()
+    return f"{store.store_id}-{store.generation()}"
+
+
+def similar_versions(
+    file_id: str, threshold: float = similarity.DEFAULT_THRESHOLD, limit: int | None = None
+) -> list[dict]:
+    version_path(file_id)
+    matches = get_store().similar(file_id, threshold, limit)
+    if matches is None:
+        raise FileNotFoundError(file_id)
+    return [
+        {"id": match_id, "label": label, "timestamp": _display_timestamp(created_at), "similarity": round(score, 3)}
+        for match_id, label, created_at, score in matches
+    ]
+
+
+def version_clusters(threshold: float = similarity.DEFAULT_THRESHOLD) -> list[list[str]]:
+    return get_store().clusters(threshold)
+
+
+def search_versions(
+    query: SearchQuery, fingerprint: str, limit: int | None = None, offset: int = 0
+) -> list[dict]:
+    return [
+        {
+            "id": file_id,
+            "label": label,
+            "timestamp": _display_timestamp(created_at),
+            # Unrounded: BM25 scores on small stores are often well below 0.001.
+            "score": score,
+        }
+        for file_id, label, created_at, score in get_store().search(query, fingerprint, limit, offset)
+    ]
+
+
+def blame_label(label: str) -> dict:
+    """Each line of the latest version of ``label`` with the version that introduced it."""
+    result = get_store().blame(sanitize_label(label))
+    if result is None:
+        raise FileNotFoundError(label)
+    file_id, text, origins = result
+    return {
+        "label": sanitize_label(label),
+        "id": file_id,
+        "lines": [
+            {"line": number, "id": origin, "timestamp": _display_timestamp(_split_id(origin)[0]), "text": line}
+            for number, (line, origin) in enumerate(zip(text.splitlines(), origins), 1)
+        ],
+    }
 
 
 def load_text(file_id: str) -> str:
-    path = version_path(file_id)
-    if not path.exists():
+    version_path(file_id)
+    text = get_store().load(file_id)
+    if text is None:
         raise FileNotFoundError(file_id)
-    return path.read_text(encoding="utf-8")
+    return text
+
+
+def save_version(label: str, text: str, snapshot: Snapshot | None = None) -> str:
+    return get_store().save_new(sanitize_label(label), text, snapshot)
 
 
-def save_version(label: str, text: str) -> str:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = dt.datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    safe_label = sanitize_label(label)
-    filename = f"{timestamp}_{safe_label}.txt"
-    path = version_path(filename)
-    path.write_text(text, encoding="utf-8")
-    return filename
+def import_versions(directory: Path | None = None) -> int:
+    return get_store().import_directory(directory or DATA_DIR)
@@ -0,0 +1,249 @@
+"""File watching for ``promptforge lint --watch``.
+
+Linux uses inotify through ctypes; elsewhere, or when inotify is unavailable,
+the watcher falls back to polling. Polling stats directories for added or
+removed entries and stats the files it already knows about for modifications.
+Either way only the files that changed are reported.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import ctypes
+import ctypes.util
+import errno
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+from typing import Iterable
+
+from promptforge.batch import PROMPT_SUFFIXES
+
+DEBOUNCE_SECONDS = 0.2
+POLL_INTERVAL = 0.5
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher(ABC):
+    """Tracks explicitly named files plus every prompt file below the given directories."""
+
+    def __init__(self, files: Iterable[Path], directories: Iterable[Path]) -> None:
+        self.files = set(files)
+        self.roots = list(directories)
+
+    def _wanted(self, path: Path, recursive: bool) -> bool:
+        if path in self.files:
+            return True
+        return recursive and path.suffix in PROMPT_SUFFIXES
+
+    @abstractmethod
+    def wait(self, timeout: float | None) -> set[Path]:
+        """Block until something changes or ``timeout`` passes; return the changed files."""
+
+    def close(self) -> None:
+        return None
+
+
+class InotifyWatcher(Watcher):
+    def __init__(self, files: Iterable[Path], directories: Iterable[Path]) -> None:
+        super().__init__(files, directories)
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch descriptor -> (directory, whether prompt files below it are tracked).
+        self._watches: dict[int, tuple[Path, bool]] = {}
+        # Files seen so far, so a directory moved away can report the files it took along.
+        self._known: set[Path] = set(self.files)
+        try:
+            # Editors often save by renaming a temp file over the original, which
+            # replaces the inode, so named files are watched through their directory.
+            for parent in {path.parent for path in self.files}:
+                self._add(parent, recursive=False)
+            for root in self.roots:
+                self._known.update(self._add_tree(root))
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, directory: Path, recursive: bool) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK | _IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(error, f"cannot watch {directory}: {os.strerror(error)}")
+        previous = self._watches.get(wd)
+        self._watches[wd] = (directory, recursive or (previous is not None and previous[1]))
+
+    def _add_tree(self, root: Path) -> list[Path]:
+        # Returns the prompt files already inside, for directories created or moved in.
+        found: list[Path] = []
+        self._add(root, recursive=True)
+        for directory, subdirectories, names in os.walk(root):
+            for name in subdirectories:
+                self._add(Path(directory, name), recursive=True)
+            found.extend(Path(directory, name) for name in names if Path(name).suffix in PROMPT_SUFFIXES)
+        return found
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were dropped; report everything we know about.
+                    changed |= self._everything()
+                    continue
+                if mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                watched = self._watches.get(wd)
+                if watched is None or not name:
+                    continue
+                directory, recursive = watched
+                path = directory / os.fsdecode(name)
+                if mask & _IN_ISDIR:
+                    if recursive and mask & (_IN_CREATE | _IN_MOVED_TO):
+                        changed.update(self._add_tree(path))
+                    elif recursive and mask & (_IN_DELETE | _IN_MOVED_FROM):
+                        changed.update(known for known in self._known if path in known.parents)
+                    continue
+                if self._wanted(path, recursive):
+                    changed.add(path)
+        self._known |= changed
+        return changed
+
+    def _everything(self) -> set[Path]:
+        found = set(self.files)
+        for root in self.roots:
+            found.update(self._add_tree(root))
+        return found
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, files: Iterable[Path], directories: Iterable[Path], interval: float = POLL_INTERVAL) -> None:
+        super().__init__(files, directories)
+        self.interval = interval
+        self._directories: dict[Path, int] = {}
+        self._stats: dict[Path, tuple[int, int, int] | None] = {path: self._stat(path) for path in self.files}
+        for root in self.roots:
+            self._scan(root)
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[int, int, int] | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _scan(self, directory: Path) -> set[Path]:
+        # Records the directory and returns prompt files not seen before.
+        added: set[Path] = set()
+        try:
+            self._directories[directory] = directory.stat().st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            self._directories.pop(directory, None)
+            return added
+        for entry in entries:
+            path = directory / entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if path not in self._directories:
+                    added |= self._scan(path)
+            elif path.suffix in PROMPT_SUFFIXES and path not in self._stats:
+                self._stats[path] = self._stat(path)
+                added.add(path)
+        return added
+
+    def _poll(self) -> set[Path]:
+        changed: set[Path] = set()
+        # A directory's mtime only moves when entries are added, removed or renamed.
+        for directory, mtime in list(self._directories.items()):
+            try:
+                current = directory.stat().st_mtime_ns
+            except OSError:
+                self._directories.pop(directory)
+                continue
+            if current != mtime:
+                changed |= self._scan(directory)
+        for path, previous in list(self._stats.items()):
+            current = self._stat(path)
+            if current != previous:
+                changed.add(path)
+                if current is None and path not in self.files:
+                    del self._stats[path]
+                else:
+                    self._stats[path] = current
+        return changed
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self._poll()
+            if changed:
+                return changed
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining <= 0:
+                return set()
+            time.sleep(remaining)
+
+
+def open_watcher(files: Iterable[Path], directories: Iterable[Path], polling: bool = False) -> Watcher:
+    files, directories = list(files), list(directories)
+    if not polling:
+        try:
+            return InotifyWatcher(files, directories)
+        except (OSError, AttributeError):
+            # No inotify (other platforms, missing libc symbol, or watch limit reached).
+            pass
+    return PollingWatcher(files, directories)
+
+
+def changes(watcher: Watcher, debounce: float = DEBOUNCE_SECONDS) -> Iterable[set[Path]]:
+    """Yield batches of changed files, each once the burst that produced it goes quiet."""
+    while True:
+        pending = watcher.wait(None)
+        while pending:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            pending |= more
+        if pending:
+            yield pending
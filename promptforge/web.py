@@ -2,109 +2,250 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict
-import difflib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import json
 from pathlib import Path
+import queue
+import selectors
+import signal
+import socket
+import threading
+import time
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable
 from urllib.parse import urlparse
 
-from promptforge.lint import Linter
-from promptforge.rules import RULES
-from promptforge.storage import list_versions, load_text, save_version
+from promptforge import metrics
+from promptforge.api_utils import (
+    close_session_payload,
+    diff_versions_payload,
+    edit_session_payload,
+    iter_json_records,
+    lint_batch_lines,
+    linter_for,
+    lint_response,
+    open_session_payload,
+    query_params,
+    read_json,
+    save_version_payload,
+    write_blame,
+    write_cached,
+    write_json,
+    write_json_bytes,
+    write_ndjson,
+    write_rules,
+    write_similar_versions,
+    write_version_clusters,
+    write_version_search,
+    write_versions_list,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
 ASSETS_DIR = BASE_DIR / "web_assets"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 16
+# Idle keep-alive connections are dropped after this many seconds.
+KEEPALIVE_TIMEOUT = 15.0
+# A request that has started arriving must finish arriving within this many seconds.
+REQUEST_TIMEOUT = 15.0
+# Route label values for metrics; anything else is counted as "other" to bound cardinality.
+ROUTES = frozenset(
+    {
+        "/",
+        "/index.html",
+        "/favicon.ico",
+        "/metrics",
+        "/rules",
+        "/api/rules",
+        "/lint",
+        "/api/lint",
+        "/lint/batch",
+        "/api/lint/batch",
+        "/lint/session",
+        "/api/lint/session",
+        "/lint/session/edit",
+        "/api/lint/session/edit",
+        "/lint/session/close",
+        "/api/lint/session/close",
+        "/versions/list",
+        "/api/versions/list",
+        "/versions/save",
+        "/api/versions/save",
+        "/versions/diff",
+        "/api/versions/diff",
+        "/versions/similar",
+        "/api/versions/similar",
+        "/versions/clusters",
+        "/api/versions/clusters",
+        "/versions/search",
+        "/api/versions/search",
+        "/versions/blame",
+        "/api/versions/blame",
+    }
+)
 
 
-def _read_json(handler: BaseHTTPRequestHandler) -> dict:
-    length = int(handler.headers.get("Content-Length", "0"))
-    raw = handler.rfile.read(length)
-    if not raw:
-        return {}
-    return json.loads(raw.decode("utf-8"))
+@lru_cache(maxsize=None)
+def _asset(name: str) -> bytes:
+    return (ASSETS_DIR / name).read_bytes()
 
 
-def _write_json(handler: BaseHTTPRequestHandler, payload: dict, status: int = 200) -> None:
-    data = json.dumps(payload).encode("utf-8")
-    handler.send_response(status)
-    handler.send_header("Content-Type", "application/json")
-    handler.send_header("Content-Length", str(len(data)))
-    handler.end_headers()
-    handler.wfile.write(data)
+@lru_cache(maxsize=None)
+def _asset_tag(name: str) -> str:
+    return hashlib.sha256(_asset(name)).hexdigest()[:16]
 
 
 class PromptForgeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = REQUEST_TIMEOUT
+    # Until a request asks for keep-alive; PromptForgeServer parks the connection then.
+    close_connection = True
+    _status = 0
+
+    def handle(self) -> None:
+        # One request per dispatch, so a worker is only held while a request is served.
+        self.handle_one_request()
+
+    def finish(self) -> None:
+        # The socket files stay open while the connection is kept alive.
+        if self.close_connection:
+            super().finish()
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
     def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
+        if metrics.enabled():
+            self._measured(self._get)
+        else:
+            self._get()
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
+        if metrics.enabled():
+            self._measured(self._post)
+        else:
+            self._post()
+
+    def _measured(self, serve: Callable[[], None]) -> None:
+        path = urlparse(self.path).path
+        route = path if path in ROUTES else "other"
+        self._status = 0
+        started = time.perf_counter()
+        try:
+            serve()
+        finally:
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - started, route=route)
+            metrics.HTTP_REQUESTS.inc(route=route, method=self.command, status=str(self._status))
+            if self.command == "POST":
+                metrics.HTTP_REQUEST_BYTES.observe(int(self.headers.get("Content-Length", "0")), route=route)
+
+    def _get(self) -> None:
         parsed = urlparse(self.path)
-        if parsed.path in ("/", "/index.html"):
-            index_path = ASSETS_DIR / "index.html"
-            content = index_path.read_bytes()
+        if parsed.path == "/metrics" and metrics.enabled():
+            content = metrics.render().encode("utf-8")
             self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Type", metrics.CONTENT_TYPE)
             self.send_header("Content-Length", str(len(content)))
             self.end_headers()
             self.wfile.write(content)
             return
+        if parsed.path in ("/", "/index.html"):
+            write_cached(
+                self,
+                f"index-{_asset_tag('index.html')}",
+                lambda: (_asset("index.html"), HTTPStatus.OK),
+                content_type="text/html; charset=utf-8",
+            )
+            return
         if parsed.path in ("/rules", "/api/rules"):
-            rules_payload = [
-                {"rule_id": rule.rule_id, "name": rule.name, "description": rule.description}
-                for rule in RULES
-            ]
-            _write_json(self, {"rules": rules_payload})
+            write_rules(self)
             return
         if parsed.path in ("/versions/list", "/api/versions/list"):
-            _write_json(self, {"versions": list_versions()})
+            write_versions_list(self)
+            return
+        if parsed.path in ("/versions/similar", "/api/versions/similar"):
+            write_similar_versions(self)
+            return
+        if parsed.path in ("/versions/clusters", "/api/versions/clusters"):
+            write_version_clusters(self)
+            return
+        if parsed.path in ("/versions/search", "/api/versions/search"):
+            write_version_search(self)
+            return
+        if parsed.path in ("/versions/blame", "/api/versions/blame"):
+            write_blame(self)
             return
         if parsed.path == "/favicon.ico":
             self.send_response(HTTPStatus.NO_CONTENT)
+            self.send_header("Content-Length", "0")
             self.end_headers()
             return
         self.send_error(HTTPStatus.NOT_FOUND, "Not Found")
 
-    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
+    def _post(self) -> None:
         parsed = urlparse(self.path)
+        if parsed.path in ("/lint/batch", "/api/lint/batch"):
+            # Records are decoded and answered one at a time instead of reading the whole body.
+            length = int(self.headers.get("Content-Length", "0"))
+            try:
+                linter = linter_for(query_params(self.path))
+            except ValueError as exc:
+                write_json(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+                return
+            write_ndjson(self, lint_batch_lines(iter_json_records(self.rfile, length), linter))
+            return
+
         try:
-            payload = _read_json(self)
+            payload = read_json(self)
         except json.JSONDecodeError:
-            _write_json(self, {"error": "Invalid JSON"}, status=HTTPStatus.BAD_REQUEST)
+            write_json(self, {"error": "Invalid JSON"}, status=HTTPStatus.BAD_REQUEST)
             return
 
         if parsed.path in ("/lint", "/api/lint"):
             text = payload.get("text", "")
-            linter = Linter()
-            issues = [asdict(issue) for issue in linter.lint(text)]
-            _write_json(self, {"issues": issues})
+            try:
+                linter = linter_for(payload)
+            except ValueError as exc:
+                write_json(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+                return
+            write_json_bytes(self, lint_response(text, linter))
+            return
+
+        if parsed.path in ("/lint/session", "/api/lint/session"):
+            result, status = open_session_payload(payload)
+            write_json(self, result, status=status)
+            return
+
+        if parsed.path in ("/lint/session/edit", "/api/lint/session/edit"):
+            result, status = edit_session_payload(payload)
+            write_json(self, result, status=status)
+            return
+
+        if parsed.path in ("/lint/session/close", "/api/lint/session/close"):
+            result, status = close_session_payload(payload)
+            write_json(self, result, status=status)
             return
 
         if parsed.path in ("/versions/save", "/api/versions/save"):
             label = payload.get("label", "")
             text = payload.get("text", "")
             if not label:
-                _write_json(self, {"error": "Label is required"}, status=HTTPStatus.BAD_REQUEST)
+                write_json(self, {"error": "Label is required"}, status=HTTPStatus.BAD_REQUEST)
                 return
-            file_id = save_version(label, text)
-            _write_json(self, {"id": file_id})
+            write_json(self, save_version_payload(label, text))
             return
 
         if parsed.path in ("/versions/diff", "/api/versions/diff"):
-            file_a = payload.get("a")
-            file_b = payload.get("b")
-            if not file_a or not file_b:
-                _write_json(self, {"error": "Both version ids are required"}, status=HTTPStatus.BAD_REQUEST)
-                return
-            try:
-                text_a = load_text(file_a).splitlines(keepends=True)
-                text_b = load_text(file_b).splitlines(keepends=True)
-            except ValueError:
-                _write_json(self, {"error": "Invalid version id"}, status=HTTPStatus.BAD_REQUEST)
-                return
-            except FileNotFoundError:
-                _write_json(self, {"error": "Version not found"}, status=HTTPStatus.NOT_FOUND)
-                return
-            diff = difflib.unified_diff(text_a, text_b, fromfile=file_a, tofile=file_b)
-            _write_json(self, {"diff": "".join(diff)})
+            result, status = diff_versions_payload(
+                payload.get("a"), payload.get("b"), payload.get("granularity", "line")
+            )
+            write_json(self, result, status=status)
             return
 
         self.send_error(HTTPStatus.NOT_FOUND, "Not Found")
@@ -113,13 +254,188 @@ class PromptForgeHandler(BaseHTTPRequestHandler):
         return
 
 
-def main() -> None:
-    server = HTTPServer(("127.0.0.1", 8000), PromptForgeHandler)
-    print("PromptForge web UI running at http://127.0.0.1:8000")
+class PromptForgeServer(HTTPServer):
+    """HTTP server whose worker pool serves requests rather than connections.
+
+    A worker reads and answers one request, then hands a keep-alive connection
+    back to a selector thread that waits for its next request, or closes it after
+    ``KEEPALIVE_TIMEOUT`` idle seconds. Idle connections therefore hold no worker,
+    and ``workers`` bounds only the requests being served at once.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], handler: type[PromptForgeHandler], workers: int) -> None:
+        super().__init__(address, handler)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="promptforge-web")
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        # Connections handed back by workers; only the selector thread touches the selector.
+        self._parked: queue.SimpleQueue[PromptForgeHandler] = queue.SimpleQueue()
+        self._park_lock = threading.Lock()
+        self._closing = False
+        self._idle_thread = threading.Thread(target=self._watch_idle, name="promptforge-web-idle", daemon=True)
+        self._idle_thread.start()
+
+    def process_request(self, request: socket.socket, client_address: tuple[str, int]) -> None:
+        self._executor.submit(self._serve_new, request, client_address)
+
+    def _serve_new(self, request: socket.socket, client_address: tuple[str, int]) -> None:
+        try:
+            # Constructing the handler serves the first request.
+            connection = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        self._after_request(connection)
+
+    def _serve_next(self, connection: PromptForgeHandler) -> None:
+        try:
+            connection.handle()
+            connection.finish()
+        except Exception:
+            self.handle_error(connection.request, connection.client_address)
+            self._close(connection)
+            return
+        self._after_request(connection)
+
+    def _after_request(self, connection: PromptForgeHandler) -> None:
+        while not connection.close_connection and self._buffered(connection):
+            # Pipelined requests already read into the buffer would never wake the selector.
+            try:
+                connection.handle()
+                connection.finish()
+            except Exception:
+                self.handle_error(connection.request, connection.client_address)
+                self._close(connection)
+                return
+        if connection.close_connection:
+            self.shutdown_request(connection.request)
+            return
+        with self._park_lock:
+            if self._closing:
+                self._close(connection)
+                return
+            self._parked.put(connection)
+        self._wake()
+
+    @staticmethod
+    def _buffered(connection: PromptForgeHandler) -> bool:
+        request = connection.request
+        request.setblocking(False)
+        try:
+            return bool(connection.rfile.peek())
+        except OSError:
+            return False
+        finally:
+            request.settimeout(connection.timeout)
+
+    def _close(self, connection: PromptForgeHandler) -> None:
+        connection.close_connection = True
+        try:
+            connection.finish()
+        except OSError:
+            pass
+        self.shutdown_request(connection.request)
+
+    def _wake(self) -> None:
+        try:
+            self._waker.send(b"\0")
+        except BlockingIOError:
+            pass
+
+    def _watch_idle(self) -> None:
+        # Insertion order is deadline order, since every connection gets the same timeout.
+        idle: dict[socket.socket, tuple[PromptForgeHandler, float]] = {}
+        while True:
+            timeout = None
+            if idle:
+                timeout = max(0.0, next(iter(idle.values()))[1] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wakeup:
+                    try:
+                        while self._wakeup.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                connection, _ = idle.pop(key.fileobj)
+                try:
+                    self._executor.submit(self._serve_next, connection)
+                except RuntimeError:
+                    self._close(connection)
+            with self._park_lock:
+                closing = self._closing
+                while True:
+                    try:
+                        connection = self._parked.get_nowait()
+                    except queue.Empty:
+                        break
+                    idle[connection.request] = (connection, time.monotonic() + KEEPALIVE_TIMEOUT)
+                    self._selector.register(connection.request, selectors.EVENT_READ)
+            now = time.monotonic()
+            for request, (connection, deadline) in list(idle.items()):
+                if deadline > now and not closing:
+                    break
+                del idle[request]
+                self._selector.unregister(request)
+                self._close(connection)
+            if closing:
+                return
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Let in-flight requests finish, then drop the idle keep-alive connections.
+        self._executor.shutdown(wait=True)
+        with self._park_lock:
+            self._closing = True
+        self._wake()
+        self._idle_thread.join()
+        self._selector.close()
+        self._wakeup.close()
+        self._waker.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="promptforge.web", description="PromptForge web UI.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind (default: %(default)s).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum number of requests served concurrently (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Record rule, route and storage timings and serve them at /metrics.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+    server = PromptForgeServer((args.host, args.port), PromptForgeHandler, max(1, args.workers))
+
+    def stop(signum: int, frame: object) -> None:
+        # shutdown() blocks until serve_forever() returns, so it cannot run on the serving thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"PromptForge web UI running at http://{args.host}:{args.port}")
     try:
         server.serve_forever()
-    except KeyboardInterrupt:
-        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
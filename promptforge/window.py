@@ -0,0 +1,44 @@
+"""Text windows that rules evaluate, whole documents or stream slices."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from promptforge.lines import LineIndex
+from promptforge.matcher import MarkerHits, MarkerMatcher
+
+
+@dataclass(frozen=True)
+class Window:
+    """A slice of a document plus the marker hits found in it.
+
+    Rules report findings that start inside ``[start, end)``; text outside that
+    range is context shared with the neighbouring windows. ``base`` is the
+    document offset of ``content[0]``.
+    """
+
+    content: str
+    hits: MarkerHits
+    lines: LineIndex
+    start: int
+    end: int
+    base: int = 0
+
+    @classmethod
+    def whole(cls, content: str, matcher: MarkerMatcher) -> Window:
+        return cls(content, matcher.scan(content), LineIndex(content), 0, len(content))
+
+    def positions(self, marker: str) -> list[int]:
+        positions = self.hits.positions(marker)
+        if self.start == 0 and self.end == len(self.content):
+            return positions
+        return positions[bisect_left(positions, self.start) : bisect_left(positions, self.end)]
+
+    def add_marker_facts(self, facts: dict[str, int]) -> None:
+        for marker, positions in self.hits.items():
+            if marker in facts:
+                continue
+            index = bisect_left(positions, self.start)
+            if index < len(positions) and positions[index] < self.end:
+                facts[marker] = self.base + positions[index]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from promptforge import api_utils
+from promptforge.api_utils import iter_json_records
+
+
+class _RecordingStream(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads: list[int] = []
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return super().read(size)
+
+
+def _records(body: str) -> list[object]:
+    data = body.encode("utf-8")
+    return list(iter_json_records(io.BytesIO(data), len(data)))
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ("", []),
+        ("[]", []),
+        (' [ {"id": 1} , {"id": 2} ] \n', [{"id": 1}, {"id": 2}]),
+        ('[\n  {\n    "text": "a"\n  }\n]', [{"text": "a"}]),
+        ('{"id": 1}\n{"id": 2}\n', [{"id": 1}, {"id": 2}]),
+        ('[{"tags": [1, [2]]}]', [{"tags": [1, [2]]}]),
+        # Nested arrays are records of their own, not flattened into the batch.
+        ("[[{}], [{}]]", [[{}], [{}]]),
+    ],
+)
+def test_iter_json_records_accepts_arrays_and_ndjson(body, expected):
+    assert _records(body) == expected
+
+
+@pytest.mark.parametrize("body", ["{}]]]", "[{}]]", "[{} {}]", "[{},]", "[{}", "[{}] {}"])
+def test_iter_json_records_rejects_malformed_structure(body):
+    with pytest.raises(json.JSONDecodeError):
+        _records(body)
+
+
+def test_iter_json_records_reads_records_split_across_reads(monkeypatch):
+    monkeypatch.setattr(api_utils, "_READ_SIZE", 7)
+    records = [{"id": index, "text": "x" * index, "flag": True, "score": -1.5e3} for index in range(40)]
+    assert _records("\n".join(json.dumps(record) for record in records)) == records
+    assert _records(json.dumps(records, indent=2)) == records
+
+
+def test_iter_json_records_fails_fast_on_an_early_malformed_line():
+    good = json.dumps({"text": "fine"}) + "\n"
+    data = ("{bad json}\n" + good * 50_000).encode("utf-8")
+    stream = _RecordingStream(data)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records(stream, len(data)))
+    # The error is raised from the first read; the rest is discarded in fixed-size reads.
+    assert max(stream.reads) == api_utils._READ_SIZE
+    assert stream.tell() == len(data)
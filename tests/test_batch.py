@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pickle
+
+from promptforge.batch import lint_files
+from promptforge.issues import Issue, IssueColumns
+
+
+def test_issue_columns_round_trip():
+    issues = [
+        Issue("PF002", "error", "Vague verb 'Improve' found; be specific.", 2, 1),
+        Issue("PF004", "error", "Missing audience definition (who the prompt is for).", 1),
+        Issue("PF002", "error", "Vague verb 'Improve' found; be specific.", 7, 3),
+    ]
+    columns = IssueColumns.from_issues(issues)
+
+    assert list(columns) == issues
+    assert columns[1] == issues[1] and columns[-1] == issues[-1] and columns[1:] == issues[1:]
+    assert columns.rule_counts() == {"PF002": 2, "PF004": 1}
+    assert len(columns.rules) == 2 and len(columns.messages) == 2
+    assert pickle.loads(pickle.dumps(columns)) == columns
+
+
+def test_worker_results_come_back_as_columns(tmp_path):
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"prompt{index}.txt"
+        path.write_text("Improve this and make it better.\nBe concise and detailed.\n" * (index + 1))
+        paths.append(path)
+
+    serial = list(lint_files(paths, jobs=1))
+    parallel = list(lint_files(paths, jobs=2, cache_dir=tmp_path / "cache"))
+
+    assert all(isinstance(result.issues, IssueColumns) for result in parallel)
+    assert [list(result.issues) for result in parallel] == [list(result.issues) for result in serial]
+    # Columnar results are written to the cache and read back as plain issues.
+    cached = list(lint_files(paths, jobs=1, cache_dir=tmp_path / "cache"))
+    assert all(result.cached for result in cached)
+    assert [list(result.issues) for result in cached] == [list(result.issues) for result in serial]
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import json
+
+from promptforge import build
+from promptforge.api_utils import RULES_JSON, rules_payload
+
+
+def test_committed_rules_json_is_up_to_date(capsys):
+    # A stale file would keep serving old rules under an old ETag.
+    assert build.main(["--check"]) == 0, capsys.readouterr().out
+    assert json.loads(RULES_JSON.read_bytes()) == rules_payload()
+
+
+def test_check_reports_a_stale_rules_json(tmp_path, monkeypatch):
+    stale = tmp_path / "rules.json"
+    stale.write_text('{"rules": []}', encoding="utf-8")
+    monkeypatch.setattr(build, "RULES_JSON", stale)
+    assert build.main(["--check"]) == 1
+    assert build.main([]) == 0
+    assert build.main(["--check"]) == 0
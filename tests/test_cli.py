@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from promptforge import metrics
+from promptforge.cli import main
+
+
+def _run(argv: list[str]) -> int:
+    with pytest.raises(SystemExit) as exited:
+        main(argv)
+    return exited.value.code
+
+
+def test_profile_bypasses_a_warm_cache(tmp_path, capsys):
+    prompt = tmp_path / "prompt.txt"
+    prompt.write_text("Improve it.\n", encoding="utf-8")
+    argv = ["lint", str(prompt), "--cache-dir", str(tmp_path / "cache")]
+    assert _run(argv) == 1
+    capsys.readouterr()
+    try:
+        assert _run([*argv, "--profile"]) == 1
+    finally:
+        metrics.enable(False)
+    profile = capsys.readouterr().err
+    assert "rule[PF002]" in profile
+    assert "No timings recorded" not in profile
+
+
+@pytest.mark.parametrize("mode", ["--stream", "--watch"])
+def test_profile_rejects_modes_that_cannot_record_timings(tmp_path, capsys, mode):
+    prompt = tmp_path / "prompt.txt"
+    prompt.write_text("Improve it.\n", encoding="utf-8")
+    assert _run(["lint", str(prompt), mode, "--profile"]) == 2
+    assert "--profile cannot be combined" in capsys.readouterr().out
+    assert not metrics.enabled()
+
+
+@pytest.mark.parametrize("size", ["0", "-1", "big"])
+def test_chunk_size_must_be_positive(tmp_path, capsys, size):
+    prompt = tmp_path / "prompt.txt"
+    prompt.write_text("Improve it.\n", encoding="utf-8")
+    assert _run(["lint", str(prompt), "--stream", "--chunk-size", size]) == 2
+    assert "--chunk-size: must be a positive integer" in capsys.readouterr().err
+
+
+def test_stream_reads_in_chunks_of_the_given_size(tmp_path, capsys):
+    prompt = tmp_path / "prompt.txt"
+    prompt.write_text("Improve it.\n" * 50, encoding="utf-8")
+    assert _run(["lint", str(prompt), "--stream", "--chunk-size", "7"]) == 1
+    streamed = capsys.readouterr().out
+    assert _run(["lint", str(prompt), "--no-cache"]) == 1
+    assert sorted(streamed.splitlines()) == sorted(capsys.readouterr().out.splitlines())
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import random
+
+from promptforge.delta import apply_delta, make_delta
+from promptforge.diff import opcodes
+
+
+def _random_lines(rng: random.Random) -> list[str]:
+    return [rng.choice("abcdef") + "\n" for _ in range(rng.randrange(0, 30))]
+
+
+def test_opcodes_cover_both_sides_and_rebuild_the_new_text():
+    rng = random.Random(0)
+    for _ in range(300):
+        a, b = _random_lines(rng), _random_lines(rng)
+        codes = opcodes(a, b)
+        rebuilt: list[str] = []
+        i = j = 0
+        for tag, i1, i2, j1, j2 in codes:
+            assert (i1, j1) == (i, j)
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+            rebuilt.extend(b[j1:j2])
+            i, j = i2, j2
+        assert (i, j) == (len(a), len(b))
+        assert rebuilt == b
+
+
+def test_deltas_rebuild_texts_with_and_without_a_final_newline():
+    rng = random.Random(1)
+    for _ in range(200):
+        base = "".join(_random_lines(rng))
+        text = "".join(_random_lines(rng)) + rng.choice(("", "tail"))
+        assert apply_delta(base, make_delta(base, text)) == text
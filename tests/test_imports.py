@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.imports import BUDGETS, check_budgets
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda budget: budget.target)
+def test_cold_import_stays_within_budget(budget):
+    assert check_budgets((budget,), runs=3) == []
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+import pytest
+
+from promptforge import metrics
+from promptforge.issues import Issue
+from promptforge.lint import Linter
+from promptforge.rules import MissingOutputFormatRule, VagueVerbsRule
+
+DOCUMENT = "Improve this and make it better.\nBe concise and detailed.\n"
+OTHER = "For engineers: reply in JSON, under 100 words.\n"
+
+
+def test_max_issues_returns_the_full_lint_prefix():
+    full = Linter().lint(DOCUMENT)
+    for limit in range(1, len(full) + 2):
+        assert Linter(max_issues=limit).lint(DOCUMENT) == full[:limit]
+
+
+def test_max_issues_does_not_depend_on_earlier_documents():
+    linter = Linter(max_issues=2)
+    expected = Linter(max_issues=2).lint(DOCUMENT)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(linter.lint, [OTHER, DOCUMENT] * 50))
+    assert results[1::2] == [expected] * 50
+
+
+def test_profiled_lint_matches_plain_lint():
+    expected = Linter().lint(DOCUMENT)
+    metrics.enable()
+    try:
+        assert Linter().lint(DOCUMENT) == expected
+    finally:
+        metrics.enable(False)
+
+
+def test_schedule_does_not_change_the_result():
+    documents = [DOCUMENT, OTHER, "", "Write a brief summary.\n", "Enhance it, for the user.\n" * 3]
+    for document in documents:
+        for limit in (None, 1, 2, 3, 10):
+            scheduled = Linter(max_issues=limit).lint(document)
+            assert scheduled == Linter(max_issues=limit, scheduled=False).lint(document)
+            assert scheduled == Linter().lint(document)[:limit]
+
+
+
+def test_schedule_evaluates_document_level_rules_first():
+    evaluated: list[str] = []
+
+    class RecordedVerbs(VagueVerbsRule):
+        def verdict(self, facts, locate):
+            evaluated.append(self.rule_id)
+            return super().verdict(facts, locate)
+
+    class RecordedFormat(MissingOutputFormatRule):
+        def verdict(self, facts, locate):
+            evaluated.append(self.rule_id)
+            return super().verdict(facts, locate)
+
+    rules = [RecordedVerbs("PF002", "Vague verbs", ""), RecordedFormat("PF001", "Output format", "")]
+    issues = Linter(rules).lint("Improve it.\n")
+    assert evaluated == ["PF001", "PF002"]
+    assert [issue.rule_id for issue in issues] == ["PF002", "PF001"]
+
+
+def _chunked(text: str, size: int) -> list[str]:
+    return [text[index : index + size] for index in range(0, len(text), size)]
+
+
+def _ordered(issues) -> list[Issue]:
+    return sorted(issues, key=lambda issue: (issue.rule_id, issue.line, issue.column or 0, issue.message))
+
+
+def _random_document(rng: random.Random) -> str:
+    words = ("for", "the", "user", "an", "expert", "improve", "better", "brief", "in detail", "json", "42", "x")
+    spaces = (" ", "  ", "\n", " " * 40)
+    return "".join(rng.choice(words) + rng.choice(spaces) for _ in range(rng.randrange(1, 400)))
+
+
+def test_lint_stream_matches_lint():
+    rng = random.Random(0)
+    linter = Linter()
+    for _ in range(50):
+        document = _random_document(rng)
+        expected = _ordered(linter.lint(document))
+        for size in (7, 200, 4096):
+            assert _ordered(linter.lint_stream(_chunked(document, size))) == expected
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "Reply in JSON, under 100 words.\nWritten for" + " " * 600 + "the user.\n",
+        "Reply in JSON for the user. Ref " + "1" * 600 + " ends here.\n",
+        "Reply in JSON for the user. Ref " + "1" * 600 + "x ends here.\n",
+    ],
+    ids=["spaced-role", "long-number", "long-digit-word"],
+)
+def test_lint_stream_matches_lint_for_phrases_longer_than_a_chunk(document):
+    linter = Linter()
+    expected = _ordered(linter.lint(document))
+    for size in (7, 64, 300):
+        assert _ordered(linter.lint_stream(_chunked(document, size))) == expected
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import random
+import re
+
+from promptforge.lint import Linter
+from promptforge.matcher import MarkerMatcher
+from promptforge.rules import RULES
+
+MARKERS = tuple(sorted({marker for rule in RULES for marker in rule.markers()}))
+
+
+def _random_text(rng: random.Random) -> str:
+    pieces = [*MARKERS, "x", " ", "\n", ".", "ſ", "İ", "_"]
+    words = [rng.choice(pieces) for _ in range(rng.randrange(0, 60))]
+    return "".join(word.upper() if rng.random() < 0.2 else word for word in words)
+
+
+def _regex_positions(text: str, marker: str) -> list[int]:
+    # Case-insensitive, but only where the text lowers to the marker: a long s
+    # matches "s" under IGNORECASE without lowering to it.
+    return [
+        match.start()
+        for match in re.finditer(f"(?={re.escape(marker)})", text, re.IGNORECASE)
+        if text[match.start() : match.start() + len(marker)].lower() == marker
+    ]
+
+
+def test_scan_matches_a_regex_per_marker():
+    rng = random.Random(0)
+    matcher = MarkerMatcher(MARKERS)
+    for _ in range(300):
+        text = _random_text(rng)
+        hits = matcher.scan(text)
+        for marker in MARKERS:
+            assert hits.positions(marker) == _regex_positions(text, marker), (text, marker)
+
+
+def test_scan_reports_overlapping_and_nested_markers():
+    hits = MarkerMatcher(["in detail", "explain in detail", "detail", "list"]).scan("Explain in DETAIL, listed.")
+    assert hits.positions("explain in detail") == [0]
+    assert hits.positions("in detail") == [8]
+    assert hits.positions("detail") == [11]
+    assert hits.positions("list") == [19]
+
+
+def test_shared_scan_matches_each_rule_on_its_own():
+    rng = random.Random(1)
+    linter = Linter()
+    for _ in range(200):
+        text = _random_text(rng)
+        expected = [issue for rule in RULES for issue in rule.check(text)]
+        assert linter.lint(text) == expected, text
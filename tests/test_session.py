@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from promptforge.issues import Issue
+from promptforge.lint import Linter
+from promptforge.session import LintSession
+
+WORDS = ("for", "the user", "improve", "better", "brief", "in detail", "json", "under", "42", "x", "audience")
+
+
+def _ordered(issues) -> list[Issue]:
+    # Sessions order a rule's findings by position; a full lint lists them marker by marker.
+    return sorted(issues, key=lambda issue: (issue.rule_id, issue.line, issue.column or 0, issue.message))
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    return "".join(rng.choice(WORDS) + rng.choice((" ", "  ", "\n", "\n\n")) for _ in range(words))
+
+
+def _random_edit(rng: random.Random, text: str) -> tuple[tuple[int, int], tuple[int, int], str]:
+    lines = text.split("\n")
+    start_line = rng.randrange(len(lines)) + 1
+    end_line = min(len(lines), start_line + rng.choice((0, 0, 1, 3)))
+    start_column = rng.randrange(len(lines[start_line - 1]) + 1) + 1
+    end_column = rng.randrange(len(lines[end_line - 1]) + 1) + 1
+    if start_line == end_line and end_column < start_column:
+        start_column, end_column = end_column, start_column
+    return (start_line, start_column), (end_line, end_column), _random_text(rng, rng.randrange(0, 4))
+
+
+def test_edits_give_the_same_issues_as_a_full_lint():
+    rng = random.Random(0)
+    linter = Linter()
+    for _ in range(20):
+        session = LintSession(linter, _random_text(rng, 40))
+        for _ in range(15):
+            session.apply_edit(*_random_edit(rng, session.text))
+            assert _ordered(session.issues()) == _ordered(linter.lint(session.text)), session.text
+
+
+def test_edit_that_removes_the_only_fact_brings_back_the_verdict():
+    linter = Linter()
+    session = LintSession(linter, "Reply in JSON,\nunder 50 words,\nfor the user.")
+    assert session.issues() == []
+    session.apply_edit((3, 1), (3, 14), "thanks.")
+    assert [issue.rule_id for issue in session.issues()] == ["PF004"]
+    assert session.issues() == linter.lint(session.text)
+
+
+def test_out_of_range_edits_are_rejected():
+    session = LintSession(Linter(), "one\ntwo")
+    with pytest.raises(ValueError):
+        session.apply_edit((3, 1), (3, 1), "x")
+    with pytest.raises(ValueError):
+        session.apply_edit((1, 5), (1, 5), "x")
+    with pytest.raises(ValueError):
+        session.apply_edit((1, 3), (1, 2), "x")
+    assert session.text == "one\ntwo"
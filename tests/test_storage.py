@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
+
+import pytest
+
+from promptforge.storage import VersionStore
+
+SAVERS = 400
+
+
+def _save_concurrently(store: VersionStore, saves: list[tuple]) -> list[str | BaseException]:
+    start = threading.Barrier(len(saves))
+
+    def save(arguments: tuple) -> str | BaseException:
+        start.wait()
+        try:
+            return store.save_new(*arguments)
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=len(saves)) as pool:
+        return list(pool.map(save, saves))
+
+
+@pytest.mark.parametrize("group_commit", [True, False])
+def test_concurrent_saves_get_unique_ids_and_read_back(tmp_path, group_commit):
+    store = VersionStore(tmp_path, group_commit=group_commit)
+    texts = [f"version {index}\n" for index in range(SAVERS)]
+
+    ids = _save_concurrently(store, [(f"label{index % 7}", text) for index, text in enumerate(texts)])
+
+    assert len(set(ids)) == SAVERS
+    assert [store.load(file_id) for file_id in ids] == texts
+    reopened = VersionStore(tmp_path)
+    assert [reopened.load(file_id) for file_id in ids] == texts
+    assert sorted(row[0] for row in reopened.list()) == sorted(ids)
+
+
+def test_a_failed_save_does_not_fail_the_saves_committed_with_it(tmp_path):
+    store = VersionStore(tmp_path, group_commit=True)
+    # Snapshot issues must be a JSON array, so every tenth save fails inside its transaction.
+    saves = [
+        ("bad", f"text {index}\n", ("fingerprint", "not json")) if index % 10 == 0 else ("ok", f"text {index}\n")
+        for index in range(SAVERS)
+    ]
+
+    results = _save_concurrently(store, saves)
+
+    for arguments, result in zip(saves, results):
+        if arguments[0] == "bad":
+            assert isinstance(result, ValueError)
+        else:
+            assert store.load(result) == arguments[1]
+    assert {row[1] for row in store.list()} == {"ok"}
+    assert len(store.list()) == SAVERS - SAVERS // 10
+
+
+def _edited(rng: random.Random, text: str) -> str:
+    lines = text.splitlines(keepends=True)
+    index = rng.randrange(len(lines) + 1)
+    edit = rng.choice(("insert", "replace", "delete"))
+    if edit == "insert" or not lines:
+        lines.insert(index, f"line {rng.random()}\n")
+    elif edit == "replace":
+        lines[min(index, len(lines) - 1)] = f"changed {rng.random()}\n"
+    elif len(lines) > 1:
+        del lines[min(index, len(lines) - 1)]
+    # The last line sometimes loses its newline, which deltas must keep exactly.
+    text = "".join(lines)
+    return text.rstrip("\n") if rng.random() < 0.1 else text
+
+
+def test_delta_chains_round_trip_and_survive_reopening(tmp_path):
+    rng = random.Random(0)
+    store = VersionStore(tmp_path, snapshot_interval=4)
+    texts = {"alpha": "first\nsecond\nthird\n", "beta": "one line"}
+    saved: dict[str, str] = {}
+    for _ in range(60):
+        label = rng.choice(sorted(texts))
+        texts[label] = _edited(rng, texts[label])
+        saved[store.save_new(label, texts[label])] = texts[label]
+
+    store.clear_cache()
+    assert {file_id: store.load(file_id) for file_id in saved} == saved
+    reopened = VersionStore(tmp_path, snapshot_interval=4)
+    # Newest first, so every load walks its delta chain from an uncached base.
+    assert {file_id: reopened.load(file_id) for file_id in sorted(saved, reverse=True)} == saved
+    assert reopened.load("20000101000000_missing.txt") is None
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+
+from promptforge import storage
+from promptforge.api_utils import (
+    blame_payload,
+    diff_versions_payload,
+    save_version_payload,
+    search_versions_payload,
+    similar_versions_payload,
+)
+
+BASE = "Summarize the report in JSON.\nKeep it under 100 words.\nWrite for the engineer on call.\n"
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _save(label: str, text: str) -> str:
+    return save_version_payload(label, text)["id"]
+
+
+def test_diff_reports_the_issues_an_edit_added_and_removed():
+    before = _save("report", BASE.replace("Summarize", "Improve and summarize"))
+    after = _save("report", BASE.replace("in JSON", "clearly"))
+
+    payload, status = diff_versions_payload(before, after)
+
+    assert status == 200
+    assert [(issue["rule_id"], issue["line"]) for issue in payload["issues"]["added"]] == [("PF001", 1)]
+    assert [(issue["rule_id"], issue["line"]) for issue in payload["issues"]["removed"]] == [("PF002", 1)]
+    unchanged = diff_versions_payload(before, before)[0]["issues"]
+    assert (unchanged["added"], unchanged["removed"]) == ([], [])
+
+
+def test_similar_finds_near_duplicates_only():
+    original = _save("a", BASE * 3)
+    near = _save("b", (BASE * 3).replace("engineer", "developer", 1))
+    _save("c", "Translate the following sentence into French, as prose, for a student, in one line.\n")
+
+    payload, status = similar_versions_payload({"id": original, "threshold": "0.5"})
+
+    assert status == 200
+    assert [match["id"] for match in payload["similar"]] == [near]
+    assert 0.5 <= payload["similar"][0]["similarity"] < 1.0
+    assert similar_versions_payload({"id": "20000101000000_gone.txt"})[1] == 404
+    assert similar_versions_payload({"id": original, "threshold": "2"})[1] == 400
+
+
+def test_search_ranks_text_and_label_matches_and_filters_by_rule():
+    clean = _save("report", BASE)
+    vague = _save("notes", "Improve these notes about the report.\n")
+    _save("other", "Nothing relevant here.\n")
+
+    payload, status = search_versions_payload({"q": "report"})
+    assert status == 200
+    assert [result["id"] for result in payload["results"]] == [clean, vague]
+    assert all(result["score"] > 0 for result in payload["results"])
+    assert payload["next_offset"] is None
+
+    assert [result["id"] for result in search_versions_payload({"q": "rule:PF002"})[0]["results"]] == [vague]
+    assert [result["id"] for result in search_versions_payload({"q": "label:notes"})[0]["results"]] == [vague]
+    assert search_versions_payload({"q": "report", "limit": "1"})[0]["next_offset"] == 1
+    assert search_versions_payload({"q": "rule:PF999"})[1] == 400
+    assert search_versions_payload({"q": "report", "limit": "0"})[0] == {
+        "error": "limit must be a positive integer and offset non-negative"
+    }
+
+
+def test_blame_names_the_version_that_introduced_each_line():
+    first = _save("prompt", "one\ntwo\nthree\n")
+    second = _save("prompt", "one\n2\nthree\nfour\n")
+    third = _save("prompt", "zero\none\n2\nthree\nfour\n")
+
+    payload, status = blame_payload({"label": "prompt"})
+
+    assert status == 200
+    assert payload["id"] == third
+    assert [(line["text"], line["id"]) for line in payload["lines"]] == [
+        ("zero", third),
+        ("one", first),
+        ("2", second),
+        ("three", first),
+        ("four", second),
+    ]
+    assert blame_payload({"label": "missing"})[1] == 404
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from promptforge import storage, web
+from promptforge.web import PromptForgeHandler, PromptForgeServer
+
+
+@pytest.fixture
+def server():
+    server = PromptForgeServer(("127.0.0.1", 0), PromptForgeHandler, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def _get(connection: http.client.HTTPConnection, path: str = "/favicon.ico") -> int:
+    connection.request("GET", path)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def test_idle_keepalive_connections_do_not_hold_workers(server):
+    port = server.server_address[1]
+    idle = [http.client.HTTPConnection("127.0.0.1", port, timeout=5) for _ in range(4)]
+    for connection in idle:
+        assert _get(connection) == 204
+
+    started = time.perf_counter()
+    assert _get(http.client.HTTPConnection("127.0.0.1", port, timeout=5)) == 204
+    assert time.perf_counter() - started < 1.0
+    # Parked connections are still served when they send their next request.
+    assert all(_get(connection) == 204 for connection in idle)
+
+
+def test_idle_connections_are_closed_after_the_keepalive_timeout(server, monkeypatch):
+    monkeypatch.setattr(web, "KEEPALIVE_TIMEOUT", 0.2)
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    assert _get(connection) == 204
+    time.sleep(0.5)
+    assert connection.sock.recv(1) == b""
+
+
+def _request(
+    connection: http.client.HTTPConnection, method: str, path: str, headers: dict[str, str] | None = None, body=None
+) -> tuple[int, dict[str, str], bytes]:
+    connection.request(method, path, body=None if body is None else json.dumps(body), headers=headers or {})
+    response = connection.getresponse()
+    return response.status, dict(response.getheaders()), response.read()
+
+
+@pytest.fixture
+def connection(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path)
+    return http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+
+def test_rules_are_revalidated_with_304(connection):
+    status, headers, body = _request(connection, "GET", "/api/rules")
+    assert status == 200
+    assert [rule["rule_id"] for rule in json.loads(body)["rules"]] == ["PF001", "PF002", "PF003", "PF004", "PF005"]
+
+    status, again, body = _request(connection, "GET", "/api/rules", {"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+    assert again["ETag"] == headers["ETag"]
+    assert again["Cache-Control"] == headers["Cache-Control"]
+
+
+def test_version_list_etag_changes_when_a_version_is_saved(connection):
+    status, headers, body = _request(connection, "GET", "/api/versions/list?label=demo")
+    assert (status, json.loads(body)) == (200, {"versions": []})
+    etag = headers["ETag"]
+    assert _request(connection, "GET", "/api/versions/list?label=demo", {"If-None-Match": etag})[0] == 304
+    # Another query is another entity, even on the same store generation.
+    assert _request(connection, "GET", "/api/versions/list?label=other", {"If-None-Match": etag})[0] == 200
+
+    status, _, body = _request(connection, "POST", "/api/versions/save", body={"label": "demo", "text": "Hi.\n"})
+    file_id = json.loads(body)["id"]
+
+    status, headers, body = _request(connection, "GET", "/api/versions/list?label=demo", {"If-None-Match": etag})
+    assert status == 200
+    assert headers["ETag"] != etag
+    assert [version["id"] for version in json.loads(body)["versions"]] == [file_id]